@@ -11,17 +11,17 @@ class Solver(GlobalSolver):
         self.h = self.H / (self.NY - 1)
         self.dt = self.VNM * (self.h ** 2.) / self.nu
         self.NT = self.Time / self.dt
-        self.y = np.arange(0, self.H + self.h, self.h)
+        self.y = np.arange(0, self.H + self.h, self.h, dtype=self.dtype)
         assert len(self.y) == int(self.NY)
         return None
 
     def _init_value(self) -> None:
-        self.v = np.zeros(int(self.NY))
-        self.vn = np.zeros(int(self.NY))
+        self.v = np.zeros(int(self.NY), dtype=self.dtype)
+        self.vn = np.zeros(int(self.NY), dtype=self.dtype)
 
     def init_value(self) -> None:
-        self.v = np.zeros(int(self.NY))
-        self.vn = np.zeros(int(self.NY))
+        self.v = np.zeros(int(self.NY), dtype=self.dtype)
+        self.vn = np.zeros(int(self.NY), dtype=self.dtype)
 
     def init_boundary(self) -> None:
         self.vn[0] = self.U0
@@ -35,6 +35,7 @@ class Solver(GlobalSolver):
                 self.vn[i] = self.v[i] + self.VNM * (self.v[i+1] - 2.0 * self.v[i] + self.v[i-1]) + self.A * self.dt
             self.init_boundary()
             self.v = copy.deepcopy(self.vn)
+            self.record_snapshot(j)
 
     def save_to_file(self) -> None:
         with open(self.output_filepath, "w") as f:
@@ -0,0 +1,47 @@
+""" Решение задачи течения в канале с движущейся крышкой
+Схема № 3 (неявная, решение многосеточным методом на каждом шаге)
+"""
+import numpy as np
+from main import GlobalSolver
+from multigrid.mg import solve
+
+
+class Solver(GlobalSolver):
+    def _init_scheme_values(self) -> None:
+        self.h = self.H / (self.NY - 1)
+        self.dt = self.VNM * (self.h ** 2.) / self.nu
+        self.NT = self.Time / self.dt
+        self.y = np.arange(0, self.H + self.h, self.h, dtype=self.dtype)
+        assert len(self.y) == int(self.NY)
+        return None
+
+    def _init_value(self) -> None:
+        self.v = np.zeros(int(self.NY), dtype=self.dtype)
+        self.vn = np.zeros(int(self.NY), dtype=self.dtype)
+
+    def init_value(self) -> None:
+        self.v = np.zeros(int(self.NY), dtype=self.dtype)
+        self.vn = np.zeros(int(self.NY), dtype=self.dtype)
+
+    def init_boundary(self) -> None:
+        self.vn[0] = self.U0
+        self.vn[-1] = self.U1
+
+    def run_scheme(self) -> None:
+        # (1 + 2 VNM) v_i - VNM (v_{i+1} + v_{i-1}) = v_i^n + A dt
+        # приводится к виду sigma * v - laplace(v) = f
+        sigma = 1.0 / (self.nu * self.dt)
+        self.init_boundary()
+        self.v = self.vn.copy()
+        for j in range(1, int(self.NT) - 1):
+            f = sigma * self.v + self.A / self.nu
+            self.init_boundary()
+            self.vn, _ = solve(f, self.h, sigma, u0=self.vn)
+            self.v = self.vn.copy()
+            self.record_snapshot(j)
+
+    def save_to_file(self) -> None:
+        with open(self.output_filepath, "w") as f:
+            f.write('variables = "y", "u"')
+            for i in range(int(self.NY) - 1):
+                f.write(f"{self.y[i]}, {self.v[i]} \n")
@@ -0,0 +1,69 @@
+"""Точное решение задачи Бюргерса с синусоидальным начальным условием
+
+Схемы модулей burgers аппроксимируют уравнение v_t + a * v * v_x = 0
+(поток a * v^2 / 2, где a - скорость переноса схемы, например C или C / 2)
+с начальным условием v = C0 + C1 * sin(k * x). До образования разрыва
+решение постоянно вдоль характеристик и удовлетворяет неявному уравнению
+v = C0 + C1 * sin(k * (x - a * v * t)), которое решается методом Ньютона.
+При C1 << C0 это перенос синусоиды со скоростью a * C0.
+"""
+from typing import Optional
+import numpy as np
+
+
+# Допуск и максимальное число итераций метода Ньютона
+NEWTON_TOL = 1e-14
+NEWTON_ITERATIONS = 100
+
+
+def breaking_time(C1: float, k: float, speed: float) -> float:
+    """Момент образования разрыва t* = 1 / |a * C1 * k|
+
+    Args:
+        C1: float - амплитуда синусоиды
+        k: float - волновое число
+        speed: float - скорость переноса схемы a
+    Return:
+        float - момент образования разрыва (inf, если его нет)
+    """
+    rate = abs(speed * C1 * k)
+    return np.inf if rate == 0.0 else 1.0 / rate
+
+
+def sine_solution(
+    x: np.ndarray,
+    t: float,
+    C0: float,
+    C1: float,
+    k: float,
+    speed: float,
+) -> Optional[np.ndarray]:
+    """Решение в узлах x на момент времени t
+
+    Args:
+        x: np.ndarray - узлы сетки
+        t: float - момент времени
+        C0: float - постоянная составляющая начального условия
+        C1: float - амплитуда синусоиды
+        k: float - волновое число
+        speed: float - скорость переноса схемы a
+    Return:
+        Optional[np.ndarray] - решение или None, если к моменту t
+        образовался разрыв
+    """
+    if t >= breaking_time(C1, k, speed):
+        return None
+    x = np.asarray(x, dtype=np.float64)
+    shift = speed * t
+    # Начальное приближение - перенос со скоростью a * C0
+    v = C0 + C1 * np.sin(k * (x - shift * C0))
+    scale = abs(C0) + abs(C1)
+    for _ in range(NEWTON_ITERATIONS):
+        phase = k * (x - shift * v)
+        residual = v - C0 - C1 * np.sin(phase)
+        # Производная не меньше 1 - t / t* > 0 до образования разрыва
+        dv = residual / (1.0 + C1 * k * shift * np.cos(phase))
+        v -= dv
+        if np.max(np.abs(dv)) <= NEWTON_TOL * scale:
+            break
+    return v
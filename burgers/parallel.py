@@ -0,0 +1,246 @@
+"""Параллельный расчёт по схеме Леонарда (№ 4) на разделяемой памяти
+
+Сетка делится на подобласти, каждую из которых обновляет отдельный
+постоянный процесс. Два временных слоя хранятся в multiprocessing.shared_memory
+и меняются ролями на каждом шаге, поэтому обмен мнимыми ячейками между
+соседними подобластями происходит через общие буферы, а синхронизация -
+одним барьером на шаг. Результат не зависит от числа процессов и побитово
+совпадает с последовательным векторизованным расчётом leonard_serial.
+От поэлементного цикла в burgers/s2_t1.py он может отличаться в последнем
+знаке: скалярное возведение в квадрат выполняется через pow из libm,
+а векторное - умножением.
+"""
+from multiprocessing import Barrier, Process
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+
+# Число мнимых ячеек с каждой стороны (порядок шаблона схемы Леонарда)
+HALO = 2
+# Период опроса процессов (с), за который обнаруживается аварийное
+# завершение одного из них
+POLL_INTERVAL = 0.1
+
+
+def leonard_update(
+    v: np.ndarray, vn: np.ndarray, lo: int, hi: int, coef: float
+) -> None:
+    """Обновление узлов [lo, hi) нового слоя по схеме Леонарда
+
+    Args:
+        v: np.ndarray - текущий временной слой
+        vn: np.ndarray - новый временной слой
+        lo: int - первый обновляемый узел
+        hi: int - узел, следующий за последним обновляемым
+        coef: float - множитель C * dt / h / 6
+    Return:
+        None
+    """
+    # Квадраты вычисляются один раз для всей подобласти с мнимыми ячейками
+    m = hi - lo
+    flux = v[lo - 2:hi + 2] ** 2. / 2.
+    fm2, fm1, f0, fp1, fp2 = (flux[k:k + m] for k in range(2 * HALO + 1))
+    v0 = v[lo:hi]
+    positive = v0 - coef * (2 * fp1 + 3 * f0 - 6 * fm1 + fm2)
+    negative = v0 - coef * (- fp2 - 3 * f0 + 6 * fp1 - 2 * fm1)
+    vn[lo:hi] = np.where(v0 > 0, positive, negative)
+    return None
+
+
+def periodic_boundary(v: np.ndarray) -> None:
+    """Периодические граничные условия (как в init_boundary s2_t1.py)
+
+    Args:
+        v: np.ndarray - временной слой
+    Return:
+        None
+    """
+    v[0] = v[-4]
+    v[1] = v[-3]
+    v[-2] = v[2]
+    v[-1] = v[3]
+    return None
+
+
+def leonard_serial(v: np.ndarray, coef: float, NT: int) -> np.ndarray:
+    """Векторизованный последовательный расчёт
+
+    Args:
+        v: np.ndarray - начальный слой (вместе с мнимыми ячейками)
+        coef: float - множитель C * dt / h / 6
+        NT: int - число шагов в терминах цикла range(1, NT)
+    Return:
+        np.ndarray - решение на последнем слое
+    """
+    v = v.copy()
+    vn = np.zeros_like(v)
+    for j in range(1, NT):
+        leonard_update(v, vn, HALO, len(v) - HALO, coef)
+        periodic_boundary(vn)
+        v, vn = vn, v
+    return v
+
+
+def split_domain(n: int, workers: int) -> List[Tuple[int, int]]:
+    """Разбиение внутренних узлов [HALO, n - HALO) на подобласти
+
+    Args:
+        n: int - полное число узлов вместе с мнимыми
+        workers: int - число подобластей
+    Return:
+        List[Tuple[int, int]] - границы подобластей [lo, hi)
+    """
+    bounds = np.linspace(HALO, n - HALO, workers + 1).astype(int)
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def _worker(
+    names: Tuple[str, str],
+    n: int,
+    dtype: str,
+    lo: int,
+    hi: int,
+    coef: float,
+    NT: int,
+    barrier,
+) -> None:
+    """Постоянный процесс, обновляющий свою подобласть на всех шагах
+
+    Args:
+        names: Tuple[str, str] - имена буферов разделяемой памяти
+        n: int - полное число узлов
+        dtype: str - тип элементов массивов
+        lo: int - первый узел подобласти
+        hi: int - узел, следующий за последним узлом подобласти
+        coef: float - множитель C * dt / h / 6
+        NT: int - число шагов в терминах цикла range(1, NT)
+        barrier: multiprocessing.Barrier - барьер между шагами
+    Return:
+        None
+    """
+    shms = [SharedMemory(name=name) for name in names]
+    try:
+        bufs = [np.ndarray((n,), dtype=dtype, buffer=s.buf) for s in shms]
+        v, vn = bufs
+        for j in range(1, NT):
+            if j > 1:
+                # Мнимые ячейки заполняет тот процесс, который их читает:
+                # соседний слой к этому моменту завершён всеми процессами
+                if lo == HALO:
+                    v[0] = v[-4]
+                    v[1] = v[-3]
+                if hi == n - HALO:
+                    v[-2] = v[2]
+                    v[-1] = v[3]
+            leonard_update(v, vn, lo, hi, coef)
+            barrier.wait()
+            v, vn = vn, v
+        del v, vn, bufs
+    except Exception:
+        # Остальные процессы не должны зависнуть на барьере
+        barrier.abort()
+        raise
+    finally:
+        for s in shms:
+            s.close()
+    return None
+
+
+def leonard_parallel(
+    v: np.ndarray, coef: float, NT: int, workers: int
+) -> np.ndarray:
+    """Параллельный расчёт с декомпозицией области
+
+    Args:
+        v: np.ndarray - начальный слой (вместе с мнимыми ячейками)
+        coef: float - множитель C * dt / h / 6
+        NT: int - число шагов в терминах цикла range(1, NT)
+        workers: int - число процессов
+    Return:
+        np.ndarray - решение на последнем слое
+    """
+    n = len(v)
+    # Подобласть не уже HALO узлов: иначе мнимые ячейки, которые заполняет
+    # крайний процесс, читает ещё и его сосед на том же шаге
+    workers = max(1, min(workers, (n - 2 * HALO) // HALO))
+    shms = [SharedMemory(create=True, size=v.nbytes) for _ in range(2)]
+    try:
+        bufs = [
+            np.ndarray(v.shape, dtype=v.dtype, buffer=s.buf) for s in shms
+        ]
+        bufs[0][:] = v
+        bufs[1][:] = 0.0
+        barrier = Barrier(workers)
+        names = (shms[0].name, shms[1].name)
+        procs = [
+            Process(
+                target=_worker,
+                args=(names, n, v.dtype.str, lo, hi, coef, NT, barrier),
+            )
+            for lo, hi in split_domain(n, workers)
+        ]
+        for p in procs:
+            p.start()
+        # Процесс, убитый сигналом (например, при нехватке памяти), может
+        # погибнуть, удерживая блокировку барьера, и тогда barrier.abort()
+        # тоже зависнет: оставшиеся процессы завершаются принудительно
+        alive = procs
+        while alive:
+            alive[0].join(POLL_INTERVAL)
+            alive = [p for p in alive if p.exitcode is None]
+            if any(p.exitcode for p in procs):
+                for p in alive:
+                    p.terminate()
+        if any(p.exitcode != 0 for p in procs):
+            raise RuntimeError("Parallel Leonard worker failed")
+        # После NT - 1 шагов решение находится в буфере с номером (NT - 1) % 2
+        result = bufs[max(NT - 1, 0) % 2].copy()
+        if NT > 1:
+            periodic_boundary(result)
+        del bufs
+    finally:
+        for s in shms:
+            s.close()
+            s.unlink()
+    return result
+
+
+def leonard_run(
+    v: np.ndarray,
+    coef: float,
+    NT: int,
+    workers: int,
+    every: int = 0,
+    record: Optional[Callable[[int, np.ndarray], None]] = None,
+) -> np.ndarray:
+    """Расчёт векторизованно (workers = 1) или параллельно (workers > 1)
+    отрезками по every шагов с вызовом record после каждого отрезка.
+    Результат побитово совпадает с расчётом одним отрезком; при
+    параллельном расчёте процессы запускаются заново для каждого отрезка
+
+    Args:
+        v: np.ndarray - начальный слой (вместе с мнимыми ячейками)
+        coef: float - множитель C * dt / h / 6
+        NT: int - число шагов в терминах цикла range(1, NT)
+        workers: int - число процессов
+        every: int - длина отрезка в шагах (0 - весь расчёт одним
+        отрезком)
+        record: Optional[Callable[[int, np.ndarray], None]] - функция,
+        получающая номер последнего выполненного шага и решение на нём
+    Return:
+        np.ndarray - решение на последнем слое
+    """
+    total = max(NT - 1, 0)
+    every = every if every > 0 else max(total, 1)
+    done = 0
+    while done < total:
+        steps = min(every, total - done)
+        if workers > 1:
+            v = leonard_parallel(v, coef, steps + 1, workers)
+        else:
+            v = leonard_serial(v, coef, steps + 1)
+        done += steps
+        if record is not None:
+            record(done, v)
+    return v
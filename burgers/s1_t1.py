@@ -3,9 +3,11 @@
 """
 import math
 import copy
+from typing import Optional
 import numpy as np
-import matplotlib.pyplot as plt
 from main import GlobalSolver
+from burgers.exact import sine_solution
+import render
 
 
 class Solver(GlobalSolver):
@@ -29,7 +31,12 @@ class Solver(GlobalSolver):
             \tComputed NT = {self.NT}"
         )
 
-        self.x = np.arange(-self.h, (self.NX + 1) * self.h, self.h)
+        # Конец отрезка сдвинут на полшага: число узлов не зависит от
+        # ошибок округления
+        self.x = np.arange(
+            -self.h, (self.NX + 0.5) * self.h, self.h,
+            dtype=self.dtype,
+        )
         return None
 
     def run_scheme(self) -> None:
@@ -52,6 +59,7 @@ class Solver(GlobalSolver):
                     )
             self.init_boundary()
             self.v = copy.deepcopy(self.vn)
+            self.record_snapshot(j)
         return None
 
     def init_value(self) -> None:
@@ -64,7 +72,7 @@ class Solver(GlobalSolver):
         """
         # Н.У. имеет вид: C0 + C1 * sin(m * pi * x / L)
         self.v = self.C0 + self.C1 * np.sin(self.x * self.m * math.pi / self.L)
-        self.vn = np.zeros((len(self.x)))
+        self.vn = np.zeros(len(self.x), dtype=self.dtype)
         return None
 
     def init_boundary(self) -> None:
@@ -80,6 +88,25 @@ class Solver(GlobalSolver):
         self.vn[-1] = self.vn[2]
         return None
 
+    def exact_solution(self) -> Optional[np.ndarray]:
+        """Точное решение в узлах сетки (до образования разрыва)
+
+        Args:
+            None
+        Return:
+            Optional[np.ndarray] - точное решение после NT - 1 шагов
+            (цикл range(1, NT)) или None, если образовался разрыв
+        """
+        # Поток (v^2 / 2) делится на 2 h: скорость переноса C / 2
+        return sine_solution(
+            self.x,
+            (int(self.NT) - 1) * self.dt,
+            self.C0,
+            self.C1,
+            self.m * math.pi / self.L,
+            self.C / 2,
+        )
+
     def save_to_file(self) -> None:
         """Запись решения в файл
 
@@ -99,41 +126,35 @@ class Solver(GlobalSolver):
             / (1 - self.CFL * (1 - np.cos(beta)))
         )
 
-        fig, ax = plt.subplots()
+        exact = self.exact_solution()
+        if exact is None:
+            # После образования разрыва точного решения нет
+            exact = np.full(len(self.x), np.nan)
 
-        ax.plot(self.x[1:-1], self.v[1:-1], label="numer")
-        ax.plot(
-            self.x[1:-1],
-            [
-                math.sin(k * x - k * self.dt * self.NT * self.C)
-                for x in self.x[1:-1]
-            ],
-            linestyle=':',
-            linewidth=1,
-            label="analytical",
-        )
-        ax.plot(
-            self.x[1:-1],
+        x = self.x[1:-1]
+        render.plot(
+            "s1_t1_burg.png",
+            x,
             [
-                (g**self.NT) * math.sin(k * x + fe * self.NT)
-                for x in self.x[1:-1]
+                {"y": self.v[1:-1].copy(), "label": "numer"},
+                {
+                    "y": exact[1:-1],
+                    "linestyle": ':',
+                    "linewidth": 1,
+                    "label": "analytical",
+                },
+                {
+                    "y": (g**self.NT) * np.sin(k * x + fe * self.NT),
+                    "linestyle": '--',
+                    "linewidth": 1,
+                    "label": "numer_estimate",
+                },
             ],
-            linestyle='--',
-            linewidth=1,
-            label="numer_estimate",
         )
-        ax.set_xlabel('x')
-        ax.set_ylabel('u')
-
-        fig.set_figheight(8)
-        fig.set_figwidth(10)
-
-        ax.legend()
-        plt.savefig("s1_t1_burg.png", format='png')
         with open(self.output_filepath, "w") as f:
             f.write('Variables = "x", "u", "u_exac", "u_num_exac"\n')
             for i, x in enumerate(self.x[1:-1]):
-                v_e = math.sin(k * x - k * self.dt * self.NT * self.C)
+                v_e = exact[i + 1]
                 v_num_e = (g**self.NT) * math.sin(k * x + fe * self.NT)
                 f.write(f"{x}, {self.v[i + 1]}, {v_e}, {v_num_e} \n")
         return None
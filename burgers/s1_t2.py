@@ -2,8 +2,8 @@
 с помощью явной противопоточной схемой первого порядка (№1)"""
 import copy
 import numpy as np
-import matplotlib.pyplot as plt
 from main import GlobalSolver
+import render
 
 
 class Solver(GlobalSolver):
@@ -27,7 +27,12 @@ class Solver(GlobalSolver):
             \tComputed NT = {self.NT}"
         )
 
-        self.x = np.arange(-self.h, self.L + 2 * self.h, self.h)
+        # Конец отрезка сдвинут на полшага: число узлов не зависит от
+        # ошибок округления
+        self.x = np.arange(
+            -self.h, self.L + 1.5 * self.h, self.h,
+            dtype=self.dtype,
+        )
         return None
 
     def init_value(self) -> None:
@@ -39,8 +44,8 @@ class Solver(GlobalSolver):
             None
         """
         full_dim = len(self.x)
-        self.v = np.array([init_func(x) for x in self.x])
-        self.vn = np.zeros((full_dim))
+        self.v = np.array([init_func(x) for x in self.x], dtype=self.dtype)
+        self.vn = np.zeros(full_dim, dtype=self.dtype)
         return None
 
     def init_boundary(self) -> None:
@@ -76,6 +81,7 @@ class Solver(GlobalSolver):
                     )
             self.init_boundary()
             self.v = copy.deepcopy(self.vn)
+            self.record_snapshot(j)
         return None
 
     def save_to_file(self) -> None:
@@ -86,23 +92,19 @@ class Solver(GlobalSolver):
         Return:
             None
         """
-
-        fig, ax = plt.subplots()
-        ax.plot(self.x[1:-1], self.v[1:-1], label="numerical")
-        ax.plot(
+        render.plot(
+            "s1_t2_burg.png",
             self.x[1:-1],
-            [init_func(x) for x in (self.x[1:-1])],
-            linestyle=':',
-            linewidth=1,
-            label="analytical",
+            [
+                {"y": self.v[1:-1].copy(), "label": "numerical"},
+                {
+                    "y": np.array([init_func(x) for x in self.x[1:-1]]),
+                    "linestyle": ':',
+                    "linewidth": 1,
+                    "label": "analytical",
+                },
+            ],
         )
-        ax.set_xlabel('x')
-        ax.set_ylabel('u')
-
-        fig.set_figheight(8)
-        fig.set_figwidth(10)
-        ax.legend()
-        plt.savefig("s1_t2_burg.png", format='png')
 
         with open(self.output_filepath, "w") as f:
             f.write('Variables = "x", "u",\n')
@@ -3,9 +3,12 @@
 """
 import math
 import copy
+from typing import Optional
 import numpy as np
-import matplotlib.pyplot as plt
 from main import GlobalSolver
+from burgers.exact import sine_solution
+import render
+from burgers.parallel import leonard_run
 
 
 class Solver(GlobalSolver):
@@ -29,18 +32,39 @@ class Solver(GlobalSolver):
             \tComputed NT = {self.NT}"
         )
 
-        self.x = np.arange(-2 * self.h, (self.NX + 2) * self.h, self.h)
+        # Конец отрезка сдвинут на полшага: число узлов не зависит от
+        # ошибок округления
+        self.x = np.arange(
+            -2 * self.h, (self.NX + 1.5) * self.h, self.h,
+            dtype=self.dtype,
+        )
         print(self.x, self.NX, len(self.x), self.x[int(self.NX - 1)])
         return None
 
     def run_scheme(self) -> None:
-        """Алгоритм вычисления решения на схеме
+        """Алгоритм вычисления решения на схеме. Если во входном файле
+        задано число процессов NP, расчёт выполняется векторизованно
+        (NP = 1) или параллельно на разделяемой памяти (NP > 1)
 
         Args:
             None
         Return:
             None
         """
+        workers = int(getattr(self, "NP", 0))
+        if workers > 0:
+            coef = self.C * self.dt / self.h / 6
+
+            def record(step: int, v: np.ndarray) -> None:
+                self.v = v
+                self.record_snapshot(step)
+
+            # Снимки записываются между отрезками по SNAP шагов
+            self.v = leonard_run(
+                self.v, coef, int(self.NT), workers,
+                int(getattr(self, "SNAP", 0)), record,
+            )
+            return None
         for j in range(1, int(self.NT)):
             for i in range(2, len(self.x) - 2):
                 if self.v[i] > 0:
@@ -59,6 +83,7 @@ class Solver(GlobalSolver):
                     )
             self.init_boundary()
             self.v = copy.deepcopy(self.vn)
+            self.record_snapshot(j)
         return None
 
     def init_value(self) -> None:
@@ -71,7 +96,7 @@ class Solver(GlobalSolver):
         """
         # Н.У. имеет вид: C0 + C1 * sin(m * pi * x / L)
         self.v = self.C0 + self.C1 * np.sin(self.x * self.m * math.pi / self.L)
-        self.vn = np.zeros((len(self.x)))
+        self.vn = np.zeros(len(self.x), dtype=self.dtype)
         return None
 
     def init_boundary(self) -> None:
@@ -88,6 +113,27 @@ class Solver(GlobalSolver):
         self.vn[-1] = self.vn[3]
         return None
 
+    def exact_solution(self) -> Optional[np.ndarray]:
+        """Точное решение в узлах сетки (до образования разрыва)
+
+        Args:
+            None
+        Return:
+            Optional[np.ndarray] - точное решение после NT - 1 шагов
+            (цикл range(1, NT)) или None, если образовался разрыв
+        """
+        # Шаблон Леонарда аппроксимирует h * d/dx: скорость переноса C.
+        # Мнимые ячейки (init_boundary) замыкают область с периодом L + h,
+        # а не L, поэтому отклонение содержит погрешность O(h) от границы
+        return sine_solution(
+            self.x,
+            (int(self.NT) - 1) * self.dt,
+            self.C0,
+            self.C1,
+            self.m * math.pi / self.L,
+            self.C,
+        )
+
     def save_to_file(self) -> None:
         """Запись решения в файл
 
@@ -120,18 +166,21 @@ class Solver(GlobalSolver):
         #     / (1 - self.CFL / 3 * (1 - np.cos(beta)) ** 2.0)
         # )
 
-        fig, ax = plt.subplots()
-        ax.plot(self.x[2:-2], self.v[2:-2], label="numerical")
-        ax.plot(
-            self.x[2:-2],
-            [
-                math.sin(k * x - k * self.dt * self.NT * self.C)
-                for x in self.x[2:-2]
-            ],
-            linestyle=':',
-            linewidth=1,
-            label="analytical",
-        )
+        exact = self.exact_solution()
+        if exact is None:
+            # После образования разрыва точного решения нет
+            exact = np.full(len(self.x), np.nan)
+
+        x = self.x[2:-2]
+        curves = [
+            {"y": self.v[2:-2].copy(), "label": "numerical"},
+            {
+                "y": exact[2:-2],
+                "linestyle": ':',
+                "linewidth": 1,
+                "label": "analytical",
+            },
+        ]
         # ax.plot(
         #     self.x[2: -2],
         #     [
@@ -140,18 +189,12 @@ class Solver(GlobalSolver):
         #     ],
         #     label="numer_estimate",
         # )
-        ax.set_xlabel('x')
-        ax.set_ylabel('u')
-
-        fig.set_figheight(8)
-        fig.set_figwidth(10)
-        ax.legend()
-        plt.savefig("s2_t1_burg.png", format='png')
+        render.plot("s2_t1_burg.png", x, curves)
 
         with open(self.output_filepath, "w") as f:
             f.write('Variables = "x", "u", "u_exac", "u_num_exac"\n')
             for i, x in enumerate(self.x[2: -2]):
-                v_e = math.sin(k * x - k * self.dt * self.NT * self.C)
+                v_e = exact[i + 2]
                 # v_num_e = (g**self.NT) * math.sin(k * x + fe * self.NT)
                 f.write(f"{x}, {self.v[i + 2]}, {v_e}, \n")  # {v_num_e} \n")
         return None
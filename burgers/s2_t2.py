@@ -3,8 +3,9 @@
 """
 import copy
 import numpy as np
-import matplotlib.pyplot as plt
 from main import GlobalSolver
+import render
+from burgers.parallel import leonard_run
 
 
 class Solver(GlobalSolver):
@@ -29,17 +30,38 @@ class Solver(GlobalSolver):
         )
 
         # Задаём мнимые точки в силу порядка аппроксимации
-        self.x = np.arange(-2 * self.h, (self.NX + 2) * self.h, self.h)
+        # Конец отрезка сдвинут на полшага: число узлов не зависит от
+        # ошибок округления
+        self.x = np.arange(
+            -2 * self.h, (self.NX + 1.5) * self.h, self.h,
+            dtype=self.dtype,
+        )
         return None
 
     def run_scheme(self) -> None:
-        """Алгоритм вычисления решения на схеме
+        """Алгоритм вычисления решения на схеме. Если во входном файле
+        задано число процессов NP, расчёт выполняется векторизованно
+        (NP = 1) или параллельно на разделяемой памяти (NP > 1)
 
         Args:
             None
         Return:
             None
         """
+        workers = int(getattr(self, "NP", 0))
+        if workers > 0:
+            coef = self.C * self.dt / self.h / 6
+
+            def record(step: int, v: np.ndarray) -> None:
+                self.v = v
+                self.record_snapshot(step)
+
+            # Снимки записываются между отрезками по SNAP шагов
+            self.v = leonard_run(
+                self.v, coef, int(self.NT), workers,
+                int(getattr(self, "SNAP", 0)), record,
+            )
+            return None
         for j in range(1, int(self.NT)):
             for i in range(2, len(self.x) - 2):
                 if self.v[i] > 0:
@@ -58,6 +80,7 @@ class Solver(GlobalSolver):
                     )
             self.init_boundary()
             self.v = copy.deepcopy(self.vn)
+            self.record_snapshot(j)
         return None
 
     def init_value(self) -> None:
@@ -69,8 +92,8 @@ class Solver(GlobalSolver):
             None
         """
         full_dim = len(self.x)
-        self.v = np.array([init_func(x) for x in self.x])
-        self.vn = np.zeros((full_dim))
+        self.v = np.array([init_func(x) for x in self.x], dtype=self.dtype)
+        self.vn = np.zeros(full_dim, dtype=self.dtype)
         return None
 
     def init_boundary(self) -> None:
@@ -95,22 +118,19 @@ class Solver(GlobalSolver):
         Return:
             None
         """
-        fig, ax = plt.subplots()
-        ax.plot(self.x[2:-2], self.v[2:-2], label="numerical")
-        ax.plot(
+        render.plot(
+            "s2_t2_burg.png",
             self.x[2:-2],
-            [init_func(x) for x in self.x[2:-2]],
-            linestyle=':',
-            linewidth=1,
-            label="analytical",
+            [
+                {"y": self.v[2:-2].copy(), "label": "numerical"},
+                {
+                    "y": np.array([init_func(x) for x in self.x[2:-2]]),
+                    "linestyle": ':',
+                    "linewidth": 1,
+                    "label": "analytical",
+                },
+            ],
         )
-        ax.set_xlabel('x')
-        ax.set_ylabel('u')
-
-        fig.set_figheight(8)
-        fig.set_figwidth(10)
-        ax.legend()
-        plt.savefig("s2_t2_burg.png", format='png')
         with open(self.output_filepath, "w") as f:
             f.write('Variables = "x", "u",\n')
             for i, x in enumerate(self.x[2:-2]):
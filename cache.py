@@ -0,0 +1,209 @@
+"""Кэш результатов расчёта с адресацией по содержимому
+
+Ключ записи - хэш исходного кода солвера и всех импортируемых им модулей
+проекта, входных параметров и окружения
+расчёта (режим точности, версия NumPy). Записи хранятся в локальной
+директории в виде *.npz файлов, при превышении заданного размера
+удаляются давно не использованные записи (LRU по времени изменения файла).
+"""
+from typing import Dict, Optional
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+import numpy as np
+
+
+# Размер кэша по умолчанию, байт
+DEFAULT_CACHE_SIZE = 256 * 1024**2
+# Корень проекта: зависимости вне него (NumPy и т.д.) в ключ не входят
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def module_source(module_name: str) -> bytes:
+    """Исходный код модуля без его импортирования
+
+    Args:
+        module_name: str - путь до модуля через точку
+    Return:
+        bytes - содержимое файла модуля
+    """
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.origin is None:
+        raise ModuleNotFoundError(f"No module named '{module_name}'")
+    with open(spec.origin, "rb") as f:
+        return f.read()
+
+
+def _project_spec(module_name: str):
+    """Спецификация модуля проекта или None для внешних и ненайденных"""
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or spec.origin is None or not os.path.isfile(spec.origin):
+        return None
+    origin = os.path.abspath(spec.origin)
+    if os.path.commonpath([origin, PROJECT_ROOT]) != PROJECT_ROOT:
+        return None
+    return spec
+
+
+def module_sources(module_name: str) -> Dict[str, bytes]:
+    """Исходный код модуля и всех модулей проекта, которые он импортирует
+    (в том числе косвенно и внутри функций), без их импортирования
+
+    Args:
+        module_name: str - путь до модуля через точку
+    Return:
+        Dict[str, bytes] - содержимое файлов модулей по их именам
+    """
+    sources = {module_name: module_source(module_name)}
+    pending = [module_name]
+    while pending:
+        tree = ast.parse(sources[pending.pop()])
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0:
+                names = [node.module]
+                spec = _project_spec(node.module)
+                # from package import module
+                if spec is not None and spec.submodule_search_locations:
+                    names += [f"{node.module}.{a.name}" for a in node.names]
+            else:
+                continue
+            for name in names:
+                if name in sources:
+                    continue
+                spec = _project_spec(name)
+                if spec is not None:
+                    with open(spec.origin, "rb") as f:
+                        sources[name] = f.read()
+                    pending.append(name)
+    return sources
+
+
+def make_key(
+    sources: Dict[str, bytes],
+    params: Dict[str, float],
+    backend: Dict[str, str],
+) -> str:
+    """Вычисление ключа записи
+
+    Args:
+        sources: Dict[str, bytes] - исходные коды, от которых зависит расчёт
+        params: Dict[str, float] - входные параметры задачи
+        backend: Dict[str, str] - параметры окружения расчёта
+    Return:
+        str - sha256 в шестнадцатеричном виде
+    """
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        digest.update(name.encode("utf-8"))
+        digest.update(hashlib.sha256(sources[name]).digest())
+    digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    digest.update(json.dumps(backend, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Дисковое хранилище итоговых полей и диагностики расчётов"""
+
+    def __init__(
+        self, directory: str, max_bytes: int = DEFAULT_CACHE_SIZE
+    ) -> None:
+        """Инициализация
+
+        Args:
+            directory: str - директория хранилища (создаётся при отсутствии)
+            max_bytes: int - максимальный суммарный размер записей
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        """Чтение записи
+
+        Args:
+            key: str - ключ записи
+        Return:
+            Optional[Dict[str, object]] - результат в формате
+            main.collect_result или None, если записи нет
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["__meta__"]))
+                fields = {name: data[name] for name in meta["fields"]}
+        except (OSError, KeyError, ValueError):
+            return None
+        # Обновление времени изменения отмечает запись как используемую
+        os.utime(path)
+        return {
+            "fields": fields,
+            "diagnostics": meta["diagnostics"],
+            "output": meta["output"],
+        }
+
+    def put(self, key: str, result: Dict[str, object]) -> None:
+        """Сохранение записи с последующим вытеснением старых
+
+        Args:
+            key: str - ключ записи
+            result: Dict[str, object] - результат в формате
+            main.collect_result
+        Return:
+            None
+        """
+        meta = {
+            "fields": sorted(result["fields"]),
+            "diagnostics": result["diagnostics"],
+            "output": result["output"],
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f, __meta__=np.array(json.dumps(meta)), **result["fields"]
+                )
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self.evict()
+        return None
+
+    def evict(self) -> None:
+        """Удаление давно не использованных записей сверх max_bytes
+
+        Args:
+            None
+        Return:
+            None
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+        return None
@@ -0,0 +1,382 @@
+"""Исследование сеточной сходимости и экстраполяция Ричардсона
+
+Солвер задачи переноса (параметры L, NX, NT, CFL, C во входном файле)
+запускается на последовательности сгущающихся сеток при одном и том же
+конечном времени. Для каждого расчёта вычисляются нормы ошибки
+относительно точного решения (GlobalSolver.exact_solution), а если оно
+неизвестно - относительно экстраполяции Ричардсона по двум самым мелким
+сеткам. По парам соседних сеток определяется наблюдаемый порядок
+сходимости, по результатам подбирается самая дешёвая (по числу
+операций NX * NT) комбинация NX/CFL, обеспечивающая заданную точность.
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional, Tuple
+import io
+import math
+import os
+import tempfile
+import numpy as np
+from main import main, parse_input
+
+
+# Нормы ошибки, вычисляемые для каждого расчёта
+NORMS = ("L1", "L2", "Linf")
+
+
+def refinement_cases(
+    params: Dict[str, float],
+    levels: int,
+    ratio: int,
+    cfls: List[float],
+) -> List[Dict[str, float]]:
+    """Параметры расчётов на сгущающихся сетках
+
+    Число интервалов сетки умножается на ratio на каждом уровне, число
+    шагов - тоже, поэтому конечное время совпадает с исходным на всех
+    уровнях. Солверы выполняют NT - 1 шагов (цикл range(1, NT)), поэтому
+    конечное время равно (NT - 1) * dt. Если при заданном числе Куранта
+    конечное время не делится на шаг нацело, число шагов округляется
+    вверх, а число Куранта соответственно уменьшается (точное значение
+    передаётся солверу и попадает в таблицу).
+
+    Args:
+        params: Dict[str, float] - параметры из входного файла
+        levels: int - число уровней сгущения
+        ratio: int - коэффициент сгущения
+        cfls: List[float] - исследуемые числа Куранта
+    Return:
+        List[Dict[str, float]] - значения NX, NT, CFL для каждого расчёта
+    """
+    intervals = int(params["NX"] - 1)
+    h0 = params["L"] / intervals
+    time = (int(params["NT"]) - 1) * params["CFL"] * h0 / params["C"]
+    cases = []
+    for cfl in cfls:
+        # Допуск защищает от лишнего шага из-за ошибок округления
+        steps = max(1, math.ceil(time * params["C"] / (cfl * h0) - 1e-9))
+        exact_cfl = time * params["C"] / (steps * h0)
+        for k in range(levels):
+            cases.append(
+                {
+                    "NX": float(intervals * ratio**k + 1),
+                    "NT": float(steps * ratio**k + 1),
+                    "CFL": float(exact_cfl),
+                }
+            )
+    return cases
+
+
+def _init_worker(workdir: str) -> None:
+    """Расчёты выполняются во временной директории, чтобы графики
+    параллельных расчётов не перезаписывали друг друга"""
+    os.chdir(workdir)
+
+
+def run_case(
+    input_filepath: str,
+    solver_file: str,
+    precision: str,
+    cache_dir: Optional[str],
+    overrides: Dict[str, float],
+) -> Dict[str, object]:
+    """Один расчёт сходимости (выполняется в отдельном процессе)
+
+    Args:
+        input_filepath: str - абсолютный путь до входного файла
+        solver_file: str - путь до модуля с реализацией солвера
+        precision: str - режим точности
+        cache_dir: Optional[str] - директория кэша результатов
+        overrides: Dict[str, float] - параметры расчёта NX, NT, CFL
+    Return:
+        Dict[str, object] - узлы и решение в расчётной области,
+        точное решение (или None), шаги h и dt
+    """
+    name = "_".join(f"{key}{val:g}" for key, val in overrides.items())
+    with redirect_stdout(io.StringIO()):
+        result = main(
+            input_filepath,
+            f"conv_{name}.txt",
+            solver_file,
+            precision,
+            cache_dir,
+            overrides=overrides,
+        )
+    fields = result["fields"]
+    diagnostics = result["diagnostics"]
+    x = fields["x"]
+    # Мнимые ячейки лежат за пределами отрезка [0, L]
+    eps = 1e-6 * diagnostics["h"]
+    inside = (x >= -eps) & (x <= diagnostics["L"] + eps)
+    exact = fields.get("exact")
+    return {
+        **overrides,
+        "h": diagnostics["h"],
+        "dt": diagnostics["dt"],
+        "x": np.asarray(x[inside], dtype=np.float64),
+        "v": np.asarray(fields["v"][inside], dtype=np.float64),
+        "exact": None if exact is None else np.asarray(
+            exact[inside], dtype=np.float64
+        ),
+    }
+
+
+def error_norms(error: np.ndarray) -> Dict[str, float]:
+    """Средние по узлам нормы L1, L2 и максимальная норма ошибки"""
+    return {
+        "L1": float(np.mean(np.abs(error))),
+        "L2": float(np.sqrt(np.mean(error**2.0))),
+        "Linf": float(np.max(np.abs(error))),
+    }
+
+
+def analyse(
+    runs: List[Dict[str, object]], ratio: int, norm: str
+) -> List[Dict[str, object]]:
+    """Нормы ошибки, наблюдаемый порядок и экстраполяция Ричардсона
+
+    Args:
+        runs: List[Dict[str, object]] - результаты run_case одной серии
+        (одно число Куранта, сетки по возрастанию NX)
+        ratio: int - коэффициент сгущения
+        norm: str - норма, по которой определяется порядок
+    Return:
+        List[Dict[str, object]] - строки таблицы
+    """
+    if runs[-1]["exact"] is None and len(runs) >= 2:
+        # Эталон - экстраполяция по двум самым мелким сеткам с порядком,
+        # оценённым по трём самым мелким сеткам (или первым порядком)
+        fine, mid = runs[-1]["v"], runs[-2]["v"]
+        order = 1.0
+        if len(runs) >= 3:
+            coarse = runs[-3]["v"]
+            d1 = np.linalg.norm(mid[::ratio] - coarse)
+            d2 = np.linalg.norm(fine[::ratio**2] - mid[::ratio])
+            if d1 > 0 and d2 > 0:
+                order = math.log(d1 / d2) / math.log(ratio)
+        reference = fine[::ratio] + (fine[::ratio] - mid) / (
+            ratio**order - 1.0
+        )
+        reference_level = len(runs) - 2
+    else:
+        reference, reference_level = None, None
+
+    rows = []
+    for k, run in enumerate(runs):
+        if run["exact"] is not None:
+            error = run["v"] - run["exact"]
+        elif reference is not None and k <= reference_level:
+            step = ratio ** (reference_level - k)
+            error = run["v"] - reference[::step]
+        else:
+            error = None
+        row = {
+            key: run[key] for key in ("NX", "NT", "CFL", "h", "dt")
+        }
+        row.update(
+            error_norms(error) if error is not None
+            else {n: math.nan for n in NORMS}
+        )
+        row["order"] = math.nan
+        row["richardson"] = math.nan
+        if k > 0:
+            prev = rows[-1]
+            if prev[norm] > 0 and row[norm] > 0:
+                row["order"] = math.log(prev[norm] / row[norm]) / math.log(
+                    ratio
+                )
+            order = row["order"]
+            if run["exact"] is not None and math.isfinite(order) and order > 0:
+                coarse_v = runs[k - 1]["v"]
+                fine_v = run["v"][::ratio]
+                extrapolated = fine_v + (fine_v - coarse_v) / (
+                    ratio**order - 1.0
+                )
+                row["richardson"] = error_norms(
+                    extrapolated - runs[k - 1]["exact"]
+                )[norm]
+        rows.append(row)
+    return rows
+
+
+def recommend(
+    rows: List[Dict[str, object]], target: float, norm: str, L: float
+) -> Tuple[Dict[str, float], bool]:
+    """Выбор самой дешёвой комбинации NX/CFL с ошибкой не выше target
+
+    Args:
+        rows: List[Dict[str, object]] - строки таблицы всех серий
+        target: float - допустимая ошибка
+        norm: str - норма ошибки
+        L: float - длина расчётной области
+    Return:
+        Tuple[Dict[str, float], bool] - параметры NX, NT, CFL и признак
+        того, что они получены экстраполяцией закона ошибки K * h^p
+        за пределы выполненных расчётов (пустой словарь, если подобрать
+        не удалось)
+    """
+    passed = [r for r in rows if r[norm] <= target]
+    if passed:
+        best = min(passed, key=lambda r: r["NX"] * r["NT"])
+        return {key: best[key] for key in ("NX", "NT", "CFL")}, False
+
+    candidates = []
+    for cfl in sorted({r["CFL"] for r in rows}):
+        series = [r for r in rows if r["CFL"] == cfl]
+        last = series[-1]
+        order = last["order"]
+        if not (math.isfinite(order) and order > 0 and last[norm] > 0):
+            continue
+        # E = K * h^p, откуда h = (target / K)^(1 / p)
+        K = last[norm] / last["h"] ** order
+        h = (target / K) ** (1.0 / order)
+        NX = math.ceil(L / h) + 1
+        # Число шагов (NT - 1) пропорционально числу интервалов
+        NT = math.ceil((last["NT"] - 1) * (NX - 1) / (last["NX"] - 1)) + 1
+        candidates.append({"NX": float(NX), "NT": float(NT), "CFL": cfl})
+    if not candidates:
+        return {}, True
+    return min(candidates, key=lambda r: r["NX"] * r["NT"]), True
+
+
+def write_table(rows: List[Dict[str, object]], table_filepath: str) -> None:
+    """Запись таблицы результатов в формате выходных файлов солверов
+
+    Args:
+        rows: List[Dict[str, object]] - строки таблицы
+        table_filepath: str - путь до файла таблицы
+    Return:
+        None
+    """
+    columns = ["NX", "NT", "CFL", "h", "dt", *NORMS, "order", "richardson"]
+    with open(table_filepath, "w") as f:
+        f.write("Variables = " + ", ".join(f'"{c}"' for c in columns) + "\n")
+        for row in rows:
+            f.write(", ".join(f"{row[c]}" for c in columns) + "\n")
+    return None
+
+
+def convergence_study(
+    input_filepath: str,
+    solver_file: str,
+    levels: int = 4,
+    ratio: int = 2,
+    cfls: Optional[List[float]] = None,
+    target: Optional[float] = None,
+    norm: str = "L2",
+    workers: Optional[int] = None,
+    precision: str = "float64",
+    cache_dir: Optional[str] = None,
+) -> Tuple[List[Dict[str, object]], Dict[str, float], bool]:
+    """Запуск расчётов на всех сетках в пуле процессов и их анализ
+
+    Args:
+        input_filepath: str - путь до входного файла с исходной сеткой
+        solver_file: str - путь до модуля с реализацией солвера
+        levels: int - число уровней сгущения
+        ratio: int - коэффициент сгущения
+        cfls: Optional[List[float]] - числа Куранта (по умолчанию из файла)
+        target: Optional[float] - допустимая ошибка для подбора NX/CFL
+        norm: str - норма ошибки ("L1", "L2" или "Linf")
+        workers: Optional[int] - число процессов
+        precision: str - режим точности
+        cache_dir: Optional[str] - директория кэша результатов
+    Return:
+        Tuple[List[Dict[str, object]], Dict[str, float], bool] - строки
+        таблицы и результат recommend (пустой, если target не задан)
+    """
+    input_filepath = os.path.abspath(input_filepath)
+    if cache_dir is not None:
+        cache_dir = os.path.abspath(cache_dir)
+    params = parse_input(input_filepath)
+    cases = refinement_cases(params, levels, ratio, cfls or [params["CFL"]])
+    with tempfile.TemporaryDirectory() as workdir:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(workdir,),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    run_case,
+                    input_filepath,
+                    solver_file,
+                    precision,
+                    cache_dir,
+                    case,
+                )
+                for case in cases
+            ]
+            runs = [f.result() for f in futures]
+
+    rows = []
+    for i in range(0, len(runs), levels):
+        rows.extend(analyse(runs[i:i + levels], ratio, norm))
+    best, extrapolated = ({}, False)
+    if target is not None:
+        best, extrapolated = recommend(rows, target, norm, params["L"])
+    return rows, best, extrapolated
+
+
+def print_table(rows: List[Dict[str, object]], norm: str) -> None:
+    """Вывод таблицы результатов
+
+    Args:
+        rows: List[Dict[str, object]] - строки таблицы
+        norm: str - норма, для которой выводится ошибка экстраполяции
+    Return:
+        None
+    """
+    print(
+        f"\t{'NX':>8}{'NT':>8}{'CFL':>7}{'L1':>12}{'L2':>12}{'Linf':>12}"
+        f"{'order':>8}{'Richardson ' + norm:>16}"
+    )
+    for r in rows:
+        print(
+            f"\t{r['NX']:>8.0f}{r['NT']:>8.0f}{r['CFL']:>7.3f}"
+            f"{r['L1']:>12.3e}{r['L2']:>12.3e}{r['Linf']:>12.3e}"
+            f"{r['order']:>8.2f}{r['richardson']:>16.3e}"
+        )
+    return None
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(prog="Convergence study")
+    parser.add_argument("input_filepath", type=str)
+    parser.add_argument("solver_file", type=str)
+    parser.add_argument("--levels", type=int, default=4)
+    parser.add_argument("--ratio", type=int, default=2)
+    parser.add_argument("--cfl", type=float, nargs="+", default=None)
+    parser.add_argument("--target", type=float, default=None)
+    parser.add_argument("--norm", type=str, default="L2", choices=NORMS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--precision", type=str, default="float64")
+    parser.add_argument("--cache-dir", type=str, default=None)
+    parser.add_argument("--table", type=str, default="convergence.txt")
+    args = parser.parse_args()
+
+    rows, best, extrapolated = convergence_study(
+        args.input_filepath,
+        args.solver_file,
+        args.levels,
+        args.ratio,
+        args.cfl,
+        args.target,
+        args.norm,
+        args.workers,
+        args.precision,
+        args.cache_dir,
+    )
+    print_table(rows, args.norm)
+    write_table(rows, args.table)
+    if args.target is not None:
+        if not best:
+            print(f"\tNo NX/CFL reaches {args.norm} error {args.target}")
+        else:
+            note = " (extrapolated)" if extrapolated else ""
+            print(
+                f"\tRecommended{note}: NX = {best['NX']:.0f}, "
+                f"NT = {best['NT']:.0f}, CFL = {best['CFL']:.6g}"
+            )
+    print(f"\tTable in {args.table}")
@@ -1,22 +1,51 @@
 """Шаблонный Солвер"""
 from argparse import ArgumentParser
+from typing import Callable, Dict, Optional, Tuple
 import numpy as np
 import importlib
+import os
+from cache import DEFAULT_CACHE_SIZE, ResultCache, make_key, module_sources
+
+
+# Режимы точности: тип хранения полей и тип накопления норм ошибок
+PRECISIONS = {
+    "float64": (np.float64, np.float64),
+    "float32": (np.float32, np.float32),
+    "mixed": (np.float32, np.float64),
+}
 
 
 class GlobalSolver:
     """Класс реализует базовые методы на основе которых
     кастомизируются наследники в зависимости от задачи и типа сетки"""
 
-    def __init__(self, input_filepath: str, output_filepath: str) -> None:
+    def __init__(
+        self,
+        input_filepath: str,
+        output_filepath: str,
+        precision: str = "float64",
+        overrides: Optional[Dict[str, float]] = None,
+    ) -> None:
         """Инициализацаия
         Args:
             input_filepath: str - путь до файла с входными данными
             output_filepath: str - путь до файла в который сохраняется
             результат
+            precision: str - режим точности: "float64", "float32" или
+            "mixed" (поля во float32, нормы ошибок во float64)
+            overrides: Optional[Dict[str, float]] - значения параметров,
+            заменяющие прочитанные из файла
         """
         self.input_filepath = input_filepath
         self.output_filepath = output_filepath
+        self.overrides = overrides or {}
+        self.precision = precision
+        self.dtype, self.norm_dtype = PRECISIONS[precision]
+        # Снимки решения (номер шага, поле) для анимации
+        self.snapshots = []
+        self.snapshot_filepath = None
+        # Функция progress(step, NT), вызываемая после каждого шага
+        self.progress = None
         self._parse_filedata()
         self._init_scheme_values()
         self._init_value()
@@ -29,15 +58,12 @@ class GlobalSolver:
         Return:
             None
         """
-        with open(self.input_filepath, "r", encoding="utf-8") as f:
-            data = f.read()
-        rows = data.split("\n")
-        for row in rows:
-            val_key = row.split("!")
-            val = float(val_key[0].strip())
-            key = val_key[1].strip()
+        for key, val in parse_input(self.input_filepath).items():
             setattr(self, key, val)
             print(f"	Load {key} value from file: {key} = {val}")
+        for key, val in self.overrides.items():
+            setattr(self, key, float(val))
+            print(f"	Override {key} value: {key} = {val}")
         return None
 
     def _init_scheme_values(self) -> None:
@@ -56,7 +82,7 @@ class GlobalSolver:
                 Computed dt = {self.dt} \n\
                 Computed NT = {self.NT}"
         )
-        self.x = np.arange(0, self.L + self.h, self.h)
+        self.x = np.arange(0, self.L + self.h, self.h, dtype=self.dtype)
         assert len(self.x) == int(self.NX)
         return None
 
@@ -68,8 +94,8 @@ class GlobalSolver:
         Return:
             None
         """
-        self.v = np.zeros(int(self.NX))
-        self.vn = np.zeros(int(self.NX))
+        self.v = np.zeros(int(self.NX), dtype=self.dtype)
+        self.vn = np.zeros(int(self.NX), dtype=self.dtype)
         return None
 
     def init_value(self) -> None:
@@ -92,6 +118,94 @@ class GlobalSolver:
         сохраняет результаты решения задачи в файл"""
         pass
 
+    def exact_solution(self) -> Optional[np.ndarray]:
+        """Точное решение в узлах сетки на конечный момент времени.
+        Переопределяется в дочерних классах, для которых оно известно
+
+        Args:
+            None
+        Return:
+            Optional[np.ndarray] - точное решение или None
+        """
+        return None
+
+    def error_norms(self, reference: np.ndarray) -> Dict[str, float]:
+        """Нормы отклонения решения от эталонного (например, float64) поля
+
+        Args:
+            reference: np.ndarray - эталонное решение той же формы
+        Return:
+            Dict[str, float] - нормы L1, L2 (средние по узлам) и Linf,
+            накопленные в типе norm_dtype
+        """
+        diff = self.v.astype(self.norm_dtype) - np.asarray(
+            reference, dtype=self.norm_dtype
+        )
+        n = diff.size
+        return {
+            "L1": float(np.sum(np.abs(diff), dtype=self.norm_dtype) / n),
+            "L2": float(
+                np.sqrt(np.sum(diff * diff, dtype=self.norm_dtype) / n)
+            ),
+            "Linf": float(np.max(np.abs(diff))),
+        }
+
+    def record_snapshot(self, step: int) -> None:
+        """Обработка завершённого шага: запоминание решения, если во
+        входном файле задан интервал записи снимков SNAP (каждые SNAP
+        шагов), и сообщение о ходе расчёта, если задана функция progress
+
+        Args:
+            step: int - номер шага по времени
+        Return:
+            None
+        """
+        every = int(getattr(self, "SNAP", 0))
+        if every > 0 and step % every == 0:
+            self.snapshots.append((step, self.v.copy()))
+        if self.progress is not None:
+            self.progress(step, int(self.NT))
+        return None
+
+    def save_snapshots(self) -> None:
+        """Запись снимков решения в файл <output>_snapshots.npz с полями
+        x, v (по снимку на строку), step и t
+
+        Args:
+            None
+        Return:
+            None
+        """
+        if not self.snapshots:
+            return None
+        self.snapshot_filepath = write_snapshots(
+            self.output_filepath,
+            getattr(self, "x", getattr(self, "y", None)),
+            np.stack([v for _, v in self.snapshots]),
+            np.array([step for step, _ in self.snapshots]),
+            self.dt,
+        )
+        return None
+
+    def load_result(self, fields: Dict[str, np.ndarray]) -> None:
+        """Загрузка итоговых полей (например, из кэша) вместо расчёта:
+        после неё save_to_file строит графики и файл результата так же,
+        как после run_scheme
+
+        Args:
+            fields: Dict[str, np.ndarray] - поля из collect_result
+        Return:
+            None
+        """
+        for name, value in fields.items():
+            if isinstance(getattr(self, name, None), np.ndarray):
+                setattr(self, name, value)
+        if "snapshots" in fields:
+            self.snapshots = list(
+                zip(fields["snapshot_step"].tolist(), fields["snapshots"])
+            )
+        return None
+
     def solve(self) -> None:
         """Последовательный вызов основных этапов решения задачи
 
@@ -102,27 +216,197 @@ class GlobalSolver:
         """
         self.init_value()
         self.init_boundary()
+        self.record_snapshot(0)
         self.run_scheme()
+        self.save_snapshots()
         self.save_to_file()
         print(f"	Work is over! \n	Results in {self.output_filepath}")
         return None
 
 
-def main(input_filepath: str, output_filepath: str, solver_file: str) -> None:
+def parse_input(input_filepath: str) -> Dict[str, float]:
+    """Чтение входного файла формата "значение ! имя" построчно
+
+    Args:
+        input_filepath: str - путь до файла с входными данными
+    Return:
+        Dict[str, float] - значения параметров по именам
+    """
+    with open(input_filepath, "r", encoding="utf-8") as f:
+        data = f.read()
+    params = {}
+    rows = data.split("\n")
+    for row in rows:
+        val_key = row.split("!")
+        val = float(val_key[0].strip())
+        key = val_key[1].strip()
+        params[key] = val
+    return params
+
+
+def write_snapshots(
+    output_filepath: str,
+    x: np.ndarray,
+    v: np.ndarray,
+    step: np.ndarray,
+    dt: float,
+) -> str:
+    """Запись снимков решения в файл <output>_snapshots.npz с полями
+    x, v (по снимку на строку), step и t
+
+    Args:
+        output_filepath: str - путь до файла с результатом
+        x: np.ndarray - узлы сетки
+        v: np.ndarray - снимки решения
+        step: np.ndarray - номера шагов снимков
+        dt: float - шаг по времени
+    Return:
+        str - путь до файла снимков
+    """
+    path = f"{os.path.splitext(output_filepath)[0]}_snapshots.npz"
+    np.savez(path, x=x, v=v, step=step, t=step * dt)
+    print(f"	Snapshots in {path}")
+    return path
+
+
+def collect_result(solver: GlobalSolver) -> Dict[str, object]:
+    """Сбор итоговых полей и диагностики после расчёта
+
+    Args:
+        solver: GlobalSolver - солвер после вызова solve()
+    Return:
+        Dict[str, object] - "fields" (массивы решения и сетки, а также
+        "exact", если известно точное решение, и "snapshots" со
+        "snapshot_step", если записывались снимки), "diagnostics" (числовые
+        параметры, в том числе h, dt, NT) и "output" (содержимое файла
+        с результатом)
+    """
+    fields = {}
+    diagnostics = {}
+    for name, value in vars(solver).items():
+        if isinstance(value, np.ndarray):
+            fields[name] = value
+        elif isinstance(value, (int, float)):
+            diagnostics[name] = float(value)
+    exact = solver.exact_solution()
+    if exact is not None:
+        fields["exact"] = exact
+    if solver.snapshots:
+        fields["snapshots"] = np.stack([v for _, v in solver.snapshots])
+        fields["snapshot_step"] = np.array(
+            [step for step, _ in solver.snapshots]
+        )
+    with open(solver.output_filepath, "r", encoding="utf-8") as f:
+        output = f.read()
+    return {"fields": fields, "diagnostics": diagnostics, "output": output}
+
+
+def resolve_solver(solver_file: str) -> Tuple[type, str]:
+    """Поиск класса солвера: сначала в реестре схем, затем среди модулей
+
+    Args:
+        solver_file: str - имя схемы из реестра (schemes.py) или путь
+        до модуля с конкретной реализацией солвера
+    Return:
+        Tuple[type, str] - класс солвера и имя модуля с его исходным кодом
+    """
+    # Реестр импортирует main, поэтому импортируется здесь, а не в начале
+    import schemes
+
+    if solver_file in schemes.SCHEMES:
+        return schemes.solver_class(solver_file), "schemes"
+    return importlib.import_module(solver_file).Solver, solver_file
+
+
+def main(
+    input_filepath: str,
+    output_filepath: str,
+    solver_file: str,
+    precision: str = "float64",
+    cache_dir: Optional[str] = None,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    overrides: Optional[Dict[str, float]] = None,
+    animation: Optional[str] = None,
+    fps: int = 10,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, object]:
     """Импортирование конкретной реализации солвера и запуск вычислений
 
     Args:
         input_filepath: str - путь до файла с входными данными
         output_filepath: str - путь до файла в который сохраняется
         результат
-        solver_file: str - путь до модуля с конкретной реализацией
-        солвера
+        solver_file: str - имя схемы из реестра (см. --list-schemes) или
+        путь до модуля с конкретной реализацией солвера
+        precision: str - режим точности ("float64", "float32", "mixed")
+        cache_dir: Optional[str] - директория кэша результатов; если
+        задана, повторный расчёт с тем же кодом солвера, параметрами и
+        окружением не выполняется: итоговые поля загружаются из кэша,
+        а файл результата, графики и файл снимков строятся по ним
+        (save_to_file), анимация - по восстановленным снимкам
+        cache_size: int - максимальный размер кэша, байт
+        overrides: Optional[Dict[str, float]] - значения параметров,
+        заменяющие прочитанные из входного файла
+        animation: Optional[str] - путь до файла анимации (.gif или .mp4)
+        снимков решения (требует SNAP во входных данных); анимация
+        строится в стадии отрисовки (render.start_stage) параллельно
+        с дальнейшей работой, дождаться её можно render.stop_stage()
+        fps: int - число кадров анимации в секунду
+        progress: Optional[Callable[[int, int], None]] - функция,
+        вызываемая после каждого шага расчёта с номером шага и NT
     Return:
-        None"""
-    Solver = importlib.import_module(solver_file).Solver
-    solver = Solver(input_filepath, output_filepath)
-    solver.solve()
-    return None
+        Dict[str, object] - итоговые поля и диагностика (collect_result)"""
+    # Для схем из реестра исходный код - schemes.py, а имя схемы входит
+    # в ключ кэша как имя источника
+    import schemes
+
+    params = {**parse_input(input_filepath), **(overrides or {})}
+    if animation is not None:
+        import render
+
+        render.animation_format(animation)
+        # Проверяется до расчёта: без снимков анимацию построить нельзя
+        if int(params.get("SNAP", 0)) <= 0:
+            raise ValueError("Animation requires SNAP in the input file")
+    source = "schemes" if solver_file in schemes.SCHEMES else solver_file
+    cache = None
+    result = None
+    if cache_dir is not None:
+        cache = ResultCache(cache_dir, cache_size)
+        # В ключ входят исходные коды main, солвера и всех модулей проекта,
+        # которые они импортируют (многосеточный метод, параллельные ядра)
+        sources = {**module_sources("main"), **module_sources(source)}
+        sources[solver_file] = sources[source]
+        key = make_key(
+            sources,
+            params,
+            {"precision": precision, "numpy": np.__version__},
+        )
+        result = cache.get(key)
+    Solver, _ = resolve_solver(solver_file)
+    # Разбор входных данных и построение сетки дёшевы: при попадании
+    # в кэш пропускается только сам расчёт
+    solver = Solver(input_filepath, output_filepath, precision, overrides)
+    if result is not None:
+        solver.load_result(result["fields"])
+        solver.save_snapshots()
+        solver.save_to_file()
+        print(f"	Loaded from cache! \n	Results in {output_filepath}")
+    else:
+        solver.progress = progress
+        solver.solve()
+        result = collect_result(solver)
+        if cache is not None:
+            cache.put(key, result)
+    if animation is not None:
+        if "snapshots" not in result["fields"]:
+            raise ValueError("Animation requires SNAP in the input file")
+        render.start_stage().animate(
+            f"{os.path.splitext(output_filepath)[0]}_snapshots.npz",
+            animation,
+            fps,
+        )
+    return result
 
 
 if __name__ == "__main__":
@@ -135,12 +419,56 @@ if __name__ == "__main__":
         результат
         solver_file: str - путь до модуля с конкретной реализацией
         солвера
+        --precision: str - режим точности ("float64", "float32", "mixed")
+        --cache-dir: str - директория кэша результатов
+        --cache-size: float - максимальный размер кэша, МБ
+        --list-schemes - вывод списка схем из реестра
+        --render-workers: int - число процессов отрисовки графиков (0 -
+        графики строятся сразу после расчёта)
+        --animate: str - путь до файла анимации снимков (.gif или .mp4)
+        --fps: int - число кадров анимации в секунду
     Return:
         None
     """
     parser = ArgumentParser(prog="Numerical Solver")
-    parser.add_argument("input_filepath", type=str)
-    parser.add_argument("output_filepath", type=str)
-    parser.add_argument("solver_file", type=str)
+    parser.add_argument("input_filepath", type=str, nargs="?")
+    parser.add_argument("output_filepath", type=str, nargs="?")
+    parser.add_argument("solver_file", type=str, nargs="?")
+    parser.add_argument(
+        "--precision", type=str, default="float64", choices=list(PRECISIONS)
+    )
+    parser.add_argument("--cache-dir", type=str, default=None)
+    parser.add_argument(
+        "--cache-size", type=float, default=DEFAULT_CACHE_SIZE / 1024**2
+    )
+    parser.add_argument("--list-schemes", action="store_true")
+    parser.add_argument("--render-workers", type=int, default=0)
+    parser.add_argument("--animate", type=str, default=None)
+    parser.add_argument("--fps", type=int, default=10)
     args = parser.parse_args()
-    main(args.input_filepath, args.output_filepath, args.solver_file)
+    if args.list_schemes:
+        from schemes import list_schemes
+
+        for scheme in list_schemes():
+            print(f"\t{scheme.name:<14}{scheme.description}")
+        raise SystemExit(0)
+    if args.solver_file is None:
+        parser.error("input_filepath, output_filepath and solver_file "
+                     "are required")
+    import render
+
+    if args.render_workers > 0:
+        render.start_stage(args.render_workers)
+    try:
+        main(
+            args.input_filepath,
+            args.output_filepath,
+            args.solver_file,
+            args.precision,
+            args.cache_dir,
+            int(args.cache_size * 1024**2),
+            animation=args.animate,
+            fps=args.fps,
+        )
+    finally:
+        render.stop_stage()
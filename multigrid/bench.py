@@ -0,0 +1,67 @@
+"""Замеры времени многосеточного решателя в зависимости от размера сетки
+
+Для O(N) метода время решения, отнесённое к числу узлов, должно
+оставаться примерно постоянным при измельчении сетки.
+"""
+from argparse import ArgumentParser
+import time
+import numpy as np
+from multigrid.mg import solve
+
+
+def poisson_problem(n: int, ndim: int):
+    """Тестовая задача -laplace(u) = f с известным решением
+
+    Args:
+        n: int - число узлов по каждому направлению
+        ndim: int - размерность задачи (1 или 2)
+    Return:
+        Tuple[np.ndarray, np.ndarray, float] - правая часть,
+        точное решение и шаг сетки
+    """
+    h = 1.0 / (n - 1)
+    axes = np.meshgrid(*([np.linspace(0.0, 1.0, n)] * ndim), indexing="ij")
+    exact = np.prod([np.sin(np.pi * x) for x in axes], axis=0)
+    f = ndim * np.pi**2.0 * exact
+    return f, exact, h
+
+
+def run_benchmark(
+    ndim: int, levels: range, cycle_type: str, smoother: str
+) -> None:
+    """Решение тестовой задачи на последовательности сеток
+
+    Args:
+        ndim: int - размерность задачи (1 или 2)
+        levels: range - показатели k для сеток из 2^k + 1 узлов
+        cycle_type: str - "V" или "W"
+        smoother: str - "rbgs" или "jacobi"
+    Return:
+        None
+    """
+    print(f"\t{ndim}D, {cycle_type}-cycle, smoother = {smoother}")
+    print(f"\t{'N':>10} {'cycles':>7} {'time, s':>10} {'us/N':>8} {'error':>10}")
+    for k in levels:
+        n = 2**k + 1
+        f, exact, h = poisson_problem(n, ndim)
+        start = time.perf_counter()
+        u, history = solve(f, h, cycle_type=cycle_type, smoother=smoother)
+        elapsed = time.perf_counter() - start
+        size = f.size
+        error = np.abs(u - exact).max()
+        print(
+            f"\t{size:>10} {len(history) - 1:>7} {elapsed:>10.4f} "
+            f"{elapsed / size * 1e6:>8.3f} {error:>10.3e}"
+        )
+    return None
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(prog="Multigrid benchmark")
+    parser.add_argument("--cycle", type=str, default="V", choices=["V", "W"])
+    parser.add_argument(
+        "--smoother", type=str, default="rbgs", choices=["rbgs", "jacobi"]
+    )
+    args = parser.parse_args()
+    run_benchmark(1, range(10, 19, 2), args.cycle, args.smoother)
+    run_benchmark(2, range(5, 10), args.cycle, args.smoother)
@@ -0,0 +1,381 @@
+"""Геометрический многосеточный метод для уравнения Пуассона/Гельмгольца
+
+Решается задача sigma * u - laplace(u) = f на равномерной сетке с шагом h
+(1D или 2D) с условиями Дирихле: граничные значения берутся из
+начального приближения u0 и в процессе решения не меняются.
+Для оптимальной O(N) сходимости число интервалов по каждому направлению
+должно делиться на 2 достаточное число раз (например, N = 2^k + 1 точек):
+огрубление прекращается, как только число интервалов становится нечётным
+или сетка становится достаточно малой, и на самой грубой сетке задача
+решается прямым методом: прогонкой в 1D (O(N)) и разложением по синусам
+через БПФ в 2D (O(N log N)), поэтому сетка может иметь любое число узлов.
+W-цикл в 1D имеет сложность O(N log N), в 2D оба цикла имеют сложность O(N).
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
+
+
+# Параметры релаксации взвешенного метода Якоби для 1D и 2D
+JACOBI_OMEGA = {1: 2.0 / 3.0, 2: 4.0 / 5.0}
+# Отношение норм невязки соседних циклов, при котором сходимость считается
+# остановившейся на уровне ошибок округления
+STALL_RATIO = 0.7
+# Число внутренних узлов, при котором огрубление прекращается
+# и задача решается прямым методом
+COARSE_SIZE = 64
+
+
+def apply_operator(u: np.ndarray, h: float, sigma: float) -> np.ndarray:
+    """Вычисление A u = sigma * u - laplace(u) во внутренних узлах
+
+    Args:
+        u: np.ndarray - сеточная функция (1D или 2D)
+        h: float - шаг сетки
+        sigma: float - коэффициент при u (0 для уравнения Пуассона)
+    Return:
+        np.ndarray - значения оператора во внутренних узлах
+    """
+    inner = (slice(1, -1),) * u.ndim
+    au = (sigma + 2.0 * u.ndim / h**2.0) * u[inner]
+    for axis in range(u.ndim):
+        lo = list(inner)
+        hi = list(inner)
+        lo[axis] = slice(None, -2)
+        hi[axis] = slice(2, None)
+        au -= (u[tuple(lo)] + u[tuple(hi)]) / h**2.0
+    return au
+
+
+def residual(
+    u: np.ndarray, f: np.ndarray, h: float, sigma: float
+) -> np.ndarray:
+    """Невязка r = f - A u (в граничных узлах равна нулю)
+
+    Args:
+        u: np.ndarray - текущее приближение
+        f: np.ndarray - правая часть
+        h: float - шаг сетки
+        sigma: float - коэффициент при u
+    Return:
+        np.ndarray - невязка той же формы, что и u
+    """
+    inner = (slice(1, -1),) * u.ndim
+    r = np.zeros_like(u)
+    r[inner] = f[inner] - apply_operator(u, h, sigma)
+    return r
+
+
+def _parity_masks(shape: Tuple[int, ...]) -> List[np.ndarray]:
+    """Маски "красных" и "чёрных" внутренних узлов
+
+    Args:
+        shape: Tuple[int, ...] - форма сеточной функции
+    Return:
+        List[np.ndarray] - маски для внутренних узлов по чётности
+        суммы индексов
+    """
+    inner_shape = tuple(n - 2 for n in shape)
+    parity = sum(np.indices(inner_shape)) % 2
+    return [parity == 0, parity == 1]
+
+
+def smooth(
+    u: np.ndarray,
+    f: np.ndarray,
+    h: float,
+    sigma: float,
+    sweeps: int = 2,
+    smoother: str = "rbgs",
+    omega: Optional[float] = None,
+) -> np.ndarray:
+    """Сглаживающие итерации (на месте)
+
+    Args:
+        u: np.ndarray - текущее приближение, изменяется на месте
+        f: np.ndarray - правая часть
+        h: float - шаг сетки
+        sigma: float - коэффициент при u
+        sweeps: int - число итераций
+        smoother: str - "rbgs" (красно-чёрный Гаусс-Зейдель)
+        или "jacobi" (взвешенный Якоби)
+        omega: Optional[float] - параметр релаксации для Якоби
+    Return:
+        np.ndarray - сглаженное приближение (тот же массив u)
+    """
+    inner = (slice(1, -1),) * u.ndim
+    diag = sigma + 2.0 * u.ndim / h**2.0
+    if smoother == "jacobi":
+        if omega is None:
+            omega = JACOBI_OMEGA[u.ndim]
+        for _ in range(sweeps):
+            u[inner] += omega * residual(u, f, h, sigma)[inner] / diag
+    elif smoother == "rbgs":
+        masks = _parity_masks(u.shape)
+        for _ in range(sweeps):
+            for mask in masks:
+                r = residual(u, f, h, sigma)[inner]
+                u[inner] += np.where(mask, r / diag, 0.0)
+    else:
+        raise ValueError(f"Unknown smoother: {smoother}")
+    return u
+
+
+def _restrict_axis(a: np.ndarray, axis: int) -> np.ndarray:
+    """Полновзвешенное огрубление вдоль одной оси (2m + 1 -> m + 1)"""
+    a = np.moveaxis(a, axis, 0)
+    coarse = a[::2].copy()
+    coarse[1:-1] = 0.25 * a[1:-2:2] + 0.5 * a[2:-1:2] + 0.25 * a[3::2]
+    return np.moveaxis(coarse, 0, axis)
+
+
+def _prolong_axis(a: np.ndarray, axis: int) -> np.ndarray:
+    """Линейная интерполяция вдоль одной оси (m + 1 -> 2m + 1)"""
+    a = np.moveaxis(a, axis, 0)
+    fine = np.zeros((2 * a.shape[0] - 1,) + a.shape[1:], dtype=a.dtype)
+    fine[::2] = a
+    fine[1::2] = 0.5 * (a[:-1] + a[1:])
+    return np.moveaxis(fine, 0, axis)
+
+
+def restrict(r: np.ndarray) -> np.ndarray:
+    """Перенос невязки на грубую сетку (full weighting)
+
+    Args:
+        r: np.ndarray - невязка на мелкой сетке
+    Return:
+        np.ndarray - невязка на грубой сетке с нулевыми граничными узлами
+    """
+    for axis in range(r.ndim):
+        r = _restrict_axis(r, axis)
+    inner = (slice(1, -1),) * r.ndim
+    coarse = np.zeros_like(r)
+    coarse[inner] = r[inner]
+    return coarse
+
+
+def prolong(e: np.ndarray) -> np.ndarray:
+    """Интерполяция поправки на мелкую сетку (линейная/билинейная)
+
+    Args:
+        e: np.ndarray - поправка на грубой сетке
+    Return:
+        np.ndarray - поправка на мелкой сетке
+    """
+    for axis in range(e.ndim):
+        e = _prolong_axis(e, axis)
+    return e
+
+
+def can_coarsen(shape: Tuple[int, ...]) -> bool:
+    """Проверка возможности огрубления сетки вдвое
+
+    Args:
+        shape: Tuple[int, ...] - форма сеточной функции
+    Return:
+        bool - True, если по всем осям число интервалов чётно и число
+        внутренних узлов превышает COARSE_SIZE
+    """
+    unknowns = int(np.prod([n - 2 for n in shape]))
+    return unknowns > COARSE_SIZE and all((n - 1) % 2 == 0 for n in shape)
+
+
+@lru_cache(maxsize=32)
+def _sweep_coefficients(
+    m: int, h: float, sigma: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Прогоночные коэффициенты оператора в 1D (кэшируются)
+
+    Args:
+        m: int - число внутренних узлов
+        h: float - шаг сетки
+        sigma: float - коэффициент при u
+    Return:
+        Tuple[np.ndarray, np.ndarray] - коэффициенты при u_{i+1}
+        прямого хода и знаменатели прямого хода
+    """
+    off = -1.0 / h**2.0
+    diag = sigma + 2.0 / h**2.0
+    alpha = np.empty(m)
+    denom = np.empty(m)
+    denom[0] = diag
+    alpha[0] = off / diag
+    for i in range(1, m):
+        denom[i] = diag - off * alpha[i - 1]
+        alpha[i] = off / denom[i]
+    return alpha, denom
+
+
+def tridiagonal_solve(b: np.ndarray, h: float, sigma: float) -> np.ndarray:
+    """Решение A u = b в 1D методом прогонки за O(m)
+
+    Args:
+        b: np.ndarray - правая часть во внутренних узлах
+        h: float - шаг сетки
+        sigma: float - коэффициент при u
+    Return:
+        np.ndarray - решение во внутренних узлах
+    """
+    m = len(b)
+    alpha, denom = _sweep_coefficients(m, float(h), float(sigma))
+    off = -1.0 / h**2.0
+    u = np.empty(m)
+    u[0] = b[0] / denom[0]
+    for i in range(1, m):
+        u[i] = (b[i] - off * u[i - 1]) / denom[i]
+    for i in range(m - 2, -1, -1):
+        u[i] -= alpha[i] * u[i + 1]
+    return u
+
+
+def _sine_transform(a: np.ndarray, axis: int) -> np.ndarray:
+    """Синус-преобразование (DST-I) вдоль оси через БПФ:
+    b_k = sum_n a_n sin(pi k n / (m + 1)), k, n = 1..m
+
+    Args:
+        a: np.ndarray - значения во внутренних узлах
+        axis: int - ось преобразования
+    Return:
+        np.ndarray - коэффициенты разложения по синусам
+    """
+    a = np.moveaxis(a, axis, -1)
+    m = a.shape[-1]
+    zero = np.zeros(a.shape[:-1] + (1,), dtype=a.dtype)
+    odd = np.concatenate([zero, a, zero, -a[..., ::-1]], axis=-1)
+    b = -0.5 * np.fft.rfft(odd, axis=-1).imag[..., 1:m + 1]
+    return np.moveaxis(b, -1, axis)
+
+
+def spectral_solve(b: np.ndarray, h: float, sigma: float) -> np.ndarray:
+    """Решение A u = b разложением по собственным векторам оператора
+    (синусам) за O(N log N), при любом числе узлов
+
+    Args:
+        b: np.ndarray - правая часть во внутренних узлах
+        h: float - шаг сетки
+        sigma: float - коэффициент при u
+    Return:
+        np.ndarray - решение во внутренних узлах
+    """
+    eigenvalues = np.full(b.shape, float(sigma))
+    for axis, m in enumerate(b.shape):
+        k = np.arange(1, m + 1)
+        shape = [1] * b.ndim
+        shape[axis] = m
+        eigenvalues += (
+            4.0 * np.sin(0.5 * np.pi * k / (m + 1)) ** 2.0 / h**2.0
+        ).reshape(shape)
+    u = b
+    for axis in range(b.ndim):
+        u = _sine_transform(u, axis)
+    u = u / eigenvalues
+    for axis, m in enumerate(b.shape):
+        u = _sine_transform(u, axis) * (2.0 / (m + 1))
+    return u
+
+
+def direct_solve(
+    u: np.ndarray, f: np.ndarray, h: float, sigma: float
+) -> np.ndarray:
+    """Прямое решение на грубой сетке (на месте)
+
+    Args:
+        u: np.ndarray - приближение с заданными граничными значениями
+        f: np.ndarray - правая часть
+        h: float - шаг сетки
+        sigma: float - коэффициент при u
+    Return:
+        np.ndarray - решение (тот же массив u)
+    """
+    inner = (slice(1, -1),) * u.ndim
+    # Вклад граничных значений переносится в правую часть
+    w = u.copy()
+    w[inner] = 0.0
+    b = residual(w, f, h, sigma)[inner]
+    if u.ndim == 1:
+        u[inner] = tridiagonal_solve(b, h, sigma)
+    else:
+        u[inner] = spectral_solve(b, h, sigma)
+    return u
+
+
+def cycle(
+    u: np.ndarray,
+    f: np.ndarray,
+    h: float,
+    sigma: float = 0.0,
+    gamma: int = 1,
+    pre: int = 2,
+    post: int = 2,
+    smoother: str = "rbgs",
+) -> np.ndarray:
+    """Один многосеточный цикл (на месте)
+
+    Args:
+        u: np.ndarray - текущее приближение
+        f: np.ndarray - правая часть
+        h: float - шаг сетки
+        sigma: float - коэффициент при u
+        gamma: int - число рекурсивных вызовов на грубой сетке
+        (1 - V-цикл, 2 - W-цикл)
+        pre: int - число предварительных сглаживаний
+        post: int - число последующих сглаживаний
+        smoother: str - тип сглаживателя ("rbgs" или "jacobi")
+    Return:
+        np.ndarray - уточнённое приближение (тот же массив u)
+    """
+    if not can_coarsen(u.shape):
+        return direct_solve(u, f, h, sigma)
+    smooth(u, f, h, sigma, pre, smoother)
+    rc = restrict(residual(u, f, h, sigma))
+    ec = np.zeros_like(rc)
+    for _ in range(gamma):
+        cycle(ec, rc, 2.0 * h, sigma, gamma, pre, post, smoother)
+    u += prolong(ec)
+    smooth(u, f, h, sigma, post, smoother)
+    return u
+
+
+def solve(
+    f: np.ndarray,
+    h: float,
+    sigma: float = 0.0,
+    u0: Optional[np.ndarray] = None,
+    cycle_type: str = "V",
+    smoother: str = "rbgs",
+    pre: int = 2,
+    post: int = 2,
+    tol: float = 1e-10,
+    max_cycles: int = 50,
+) -> Tuple[np.ndarray, List[float]]:
+    """Решение sigma * u - laplace(u) = f многосеточными циклами
+
+    Args:
+        f: np.ndarray - правая часть (1D или 2D)
+        h: float - шаг сетки
+        sigma: float - коэффициент при u (0 для уравнения Пуассона)
+        u0: Optional[np.ndarray] - начальное приближение, его граничные
+        значения задают условия Дирихле (по умолчанию нули)
+        cycle_type: str - "V" или "W"
+        smoother: str - "rbgs" или "jacobi"
+        pre: int - число предварительных сглаживаний
+        post: int - число последующих сглаживаний
+        tol: float - допуск на относительную норму невязки
+        max_cycles: int - максимальное число циклов, итерации также
+        прекращаются при остановке сходимости (уровень ошибок округления)
+    Return:
+        Tuple[np.ndarray, List[float]] - решение и история
+        относительной нормы невязки
+    """
+    gamma = {"V": 1, "W": 2}[cycle_type.upper()]
+    u = np.zeros_like(f) if u0 is None else u0.astype(f.dtype, copy=True)
+    norm0 = np.linalg.norm(residual(u, f, h, sigma))
+    history = [1.0]
+    if norm0 == 0.0:
+        return u, history
+    for _ in range(max_cycles):
+        cycle(u, f, h, sigma, gamma, pre, post, smoother)
+        history.append(np.linalg.norm(residual(u, f, h, sigma)) / norm0)
+        if history[-1] < tol or history[-1] > STALL_RATIO * history[-2]:
+            break
+    return u, history
@@ -0,0 +1,120 @@
+"""Отчёт о соотношении точности и скорости в режимах float64/float32/mixed
+
+Каждый солвер запускается во всех режимах точности, время расчёта
+сравнивается с float64, а отклонение решения от float64 оценивается
+нормами GlobalSolver.error_norms (в режиме mixed нормы накапливаются
+во float64).
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from typing import Dict, List, Tuple
+import importlib
+import io
+import os
+import time
+from main import PRECISIONS
+
+
+# Каталог входных данных проекта (не зависит от текущего каталога)
+INPUT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "input"
+)
+# Солверы и входные файлы, используемые по умолчанию
+DEFAULT_CASES = [
+    ("base.s1", os.path.join(INPUT_DIR, "diff", "input_1.txt")),
+    ("base.s2", os.path.join(INPUT_DIR, "diff", "input_1.txt")),
+    ("base.s3", os.path.join(INPUT_DIR, "diff", "input_1.txt")),
+    ("burgers.s1_t1", os.path.join(INPUT_DIR, "conv", "task_1.txt")),
+    ("burgers.s1_t2", os.path.join(INPUT_DIR, "conv", "task_1.txt")),
+    ("burgers.s2_t1", os.path.join(INPUT_DIR, "conv", "task_1.txt")),
+    ("burgers.s2_t2", os.path.join(INPUT_DIR, "conv", "task_1.txt")),
+]
+
+
+def run_case(solver_file: str, input_filepath: str, precision: str):
+    """Расчёт без записи результата в файл
+
+    Args:
+        solver_file: str - путь до модуля с реализацией солвера
+        input_filepath: str - путь до файла с входными данными
+        precision: str - режим точности
+    Return:
+        Tuple[GlobalSolver, float] - солвер с решением и время расчёта
+    """
+    Solver = importlib.import_module(solver_file).Solver
+    with redirect_stdout(io.StringIO()):
+        solver = Solver(input_filepath, "", precision)
+        solver.init_value()
+        solver.init_boundary()
+        start = time.perf_counter()
+        solver.run_scheme()
+        elapsed = time.perf_counter() - start
+    return solver, elapsed
+
+
+def precision_report(
+    cases: List[Tuple[str, str]]
+) -> List[Dict[str, object]]:
+    """Сравнение режимов точности для списка солверов
+
+    Args:
+        cases: List[Tuple[str, str]] - пары (модуль солвера, входной файл)
+    Return:
+        List[Dict[str, object]] - строки отчёта
+    """
+    rows = []
+    for solver_file, input_filepath in cases:
+        reference, ref_time = run_case(solver_file, input_filepath, "float64")
+        for precision in PRECISIONS:
+            if precision == "float64":
+                solver, elapsed = reference, ref_time
+            else:
+                solver, elapsed = run_case(
+                    solver_file, input_filepath, precision
+                )
+            norms = solver.error_norms(reference.v)
+            rows.append(
+                {
+                    "solver": solver_file,
+                    "precision": precision,
+                    "time": elapsed,
+                    "speedup": ref_time / elapsed if elapsed > 0 else 0.0,
+                    "bytes": solver.v.nbytes,
+                    **norms,
+                }
+            )
+    return rows
+
+
+def print_report(rows: List[Dict[str, object]]) -> None:
+    """Вывод отчёта в виде таблицы
+
+    Args:
+        rows: List[Dict[str, object]] - строки отчёта
+    Return:
+        None
+    """
+    print(
+        f"\t{'solver':<16}{'precision':<10}{'time, s':>10}{'speedup':>9}"
+        f"{'bytes':>9}{'L1':>12}{'L2':>12}{'Linf':>12}"
+    )
+    for r in rows:
+        print(
+            f"\t{r['solver']:<16}{r['precision']:<10}{r['time']:>10.4f}"
+            f"{r['speedup']:>9.2f}{r['bytes']:>9}{r['L1']:>12.3e}"
+            f"{r['L2']:>12.3e}{r['Linf']:>12.3e}"
+        )
+    return None
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(prog="Precision report")
+    parser.add_argument(
+        "--case",
+        nargs=2,
+        action="append",
+        metavar=("SOLVER_FILE", "INPUT_FILEPATH"),
+        help="солвер и входной файл (по умолчанию все солверы репозитория)",
+    )
+    args = parser.parse_args()
+    print_report(precision_report(args.case or DEFAULT_CASES))
@@ -0,0 +1,447 @@
+"""Построение графиков и анимаций вне основного цикла расчёта
+
+Графики строятся без pyplot на холсте Agg. Фигура и линии создаются один
+раз для каждого вида графика и затем переиспользуются: для нового графика
+или кадра анимации меняются только данные линий. Если запущена стадия
+отрисовки (start_stage), графики и кадры строятся в пуле процессов и
+расчёт не ждёт их завершения; иначе график строится сразу в текущем
+процессе.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import shutil
+import subprocess
+import tempfile
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+# Размер фигур (ширина, высота) в дюймах и разрешение, как в модулях
+# солверов
+FIGSIZE = (10, 8)
+DPI = 100
+# Число кадров, отрисовываемых одним заданием пула
+FRAMES_PER_TASK = 16
+
+# Фигуры, созданные в текущем процессе, по виду графика
+_FIGURES: Dict[Tuple, Tuple[Figure, object, List[object]]] = {}
+# Стадия отрисовки текущего процесса
+_STAGE = None
+
+
+def _figure(
+    styles: Tuple[Tuple[str, str, float], ...], xlabel: str, ylabel: str
+) -> Tuple[Figure, object, List[object]]:
+    """Фигура с линиями заданных стилей (создаётся при первом обращении)
+
+    Args:
+        styles: Tuple[Tuple[str, str, float], ...] - подпись, тип и
+        толщина каждой линии
+        xlabel: str - подпись оси x
+        ylabel: str - подпись оси y
+    Return:
+        Tuple[Figure, Axes, List[Line2D]] - фигура, оси и линии
+    """
+    key = (styles, xlabel, ylabel)
+    if key not in _FIGURES:
+        fig = Figure(figsize=FIGSIZE, dpi=DPI)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        lines = [
+            ax.plot([], [], label=label, linestyle=style, linewidth=width)[0]
+            for label, style, width in styles
+        ]
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        if any(label for label, _, _ in styles):
+            ax.legend()
+        _FIGURES[key] = (fig, ax, lines)
+    return _FIGURES[key]
+
+
+def _styles(curves: Sequence[Dict[str, object]]):
+    return tuple(
+        (
+            str(c.get("label", "")),
+            str(c.get("linestyle", "-")),
+            float(c.get("linewidth", 1.5)),
+        )
+        for c in curves
+    )
+
+
+def render_plot(
+    path: str,
+    x: np.ndarray,
+    curves: Sequence[Dict[str, object]],
+    xlabel: str = "x",
+    ylabel: str = "u",
+) -> str:
+    """Построение графика и запись в файл
+
+    Args:
+        path: str - путь до файла изображения (формат по расширению)
+        x: np.ndarray - узлы сетки
+        curves: Sequence[Dict[str, object]] - линии: "y" (значения),
+        "label", "linestyle", "linewidth"
+        xlabel: str - подпись оси x
+        ylabel: str - подпись оси y
+    Return:
+        str - путь до файла изображения
+    """
+    fig, ax, lines = _figure(_styles(curves), xlabel, ylabel)
+    for line, curve in zip(lines, curves):
+        line.set_data(x, curve["y"])
+    ax.relim()
+    ax.autoscale_view()
+    fig.savefig(path)
+    return path
+
+
+def _animation_figure(
+    xlim: Tuple[float, float],
+    ylim: Tuple[float, float],
+    xlabel: str,
+    ylabel: str,
+):
+    """Фигура для кадров анимации: оси, подписи и сетка рисуются один раз
+    и сохраняются как фон, для каждого кадра перерисовываются только
+    линия решения и подпись времени
+
+    Args:
+        xlim: Tuple[float, float] - пределы оси x
+        ylim: Tuple[float, float] - пределы оси y
+        xlabel: str - подпись оси x
+        ylabel: str - подпись оси y
+    Return:
+        Tuple[Figure, Line2D, Text, object] - фигура, линия, подпись
+        времени и сохранённый фон осей
+    """
+    key = ("animation", xlim, ylim, xlabel, ylabel)
+    if key not in _FIGURES:
+        fig = Figure(figsize=FIGSIZE, dpi=DPI)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.set_xlim(*xlim)
+        ax.set_ylim(*ylim)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        (line,) = ax.plot([], [], animated=True)
+        label = ax.text(
+            0.02, 0.95, "", transform=ax.transAxes, animated=True
+        )
+        canvas.draw()
+        _FIGURES[key] = (fig, line, label, canvas.copy_from_bbox(ax.bbox))
+    return _FIGURES[key]
+
+
+def frame_size() -> Tuple[int, int]:
+    """Размер кадра анимации (ширина, высота) в пикселях"""
+    return int(FIGSIZE[0] * DPI), int(FIGSIZE[1] * DPI)
+
+
+def render_frames(
+    x: np.ndarray,
+    frames: np.ndarray,
+    times: np.ndarray,
+    first: int,
+    ylim: Tuple[float, float],
+    frame_path: str,
+    xlabel: str = "x",
+    ylabel: str = "u",
+) -> List[int]:
+    """Отрисовка группы кадров анимации
+
+    Кадры приводятся к общей для группы палитре и записываются в массив
+    индексов палитры frame_path (np.save, форма (кадры, высота, ширина))
+
+    Args:
+        x: np.ndarray - узлы сетки
+        frames: np.ndarray - решения, по одному на кадр
+        times: np.ndarray - моменты времени кадров
+        first: int - номер первого кадра группы в массиве
+        ylim: Tuple[float, float] - общие для всех кадров пределы оси y
+        frame_path: str - путь до массива кадров
+        xlabel: str - подпись оси x
+        ylabel: str - подпись оси y
+    Return:
+        List[int] - палитра группы кадров (RGB подряд)
+    """
+    from PIL import Image
+
+    fig, line, label, background = _animation_figure(
+        (float(x[0]), float(x[-1])), ylim, xlabel, ylabel
+    )
+    canvas, ax = fig.canvas, line.axes
+    out = np.load(frame_path, mmap_mode="r+")
+    palette = None
+    for i, (v, t) in enumerate(zip(frames, times)):
+        canvas.restore_region(background)
+        line.set_data(x, v)
+        label.set_text(f"t = {t:.6g}")
+        ax.draw_artist(line)
+        ax.draw_artist(label)
+        image = Image.fromarray(np.asarray(canvas.buffer_rgba())[..., :3])
+        if palette is None:
+            palette = image.quantize(256, Image.Quantize.FASTOCTREE)
+        out[first + i] = np.asarray(
+            image.quantize(palette=palette, dither=Image.Dither.NONE)
+        )
+    out.flush()
+    return palette.getpalette()
+
+
+def animation_format(output_path: str) -> str:
+    """Проверка, что анимацию можно записать в файл с таким расширением
+
+    Args:
+        output_path: str - путь до файла анимации
+    Return:
+        str - "gif" или "mp4"
+    """
+    fmt = os.path.splitext(output_path)[1].lower().lstrip(".")
+    if fmt not in ("gif", "mp4"):
+        raise ValueError(f"Unsupported animation format: {output_path}")
+    if fmt == "mp4" and shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg is required to write MP4 animations")
+    return fmt
+
+
+def assemble_animation(
+    frame_path: str,
+    palettes: List[List[int]],
+    output_path: str,
+    fps: int,
+) -> str:
+    """Сборка кадров в GIF (Pillow) или MP4 (ffmpeg)
+
+    Args:
+        frame_path: str - массив кадров (см. render_frames)
+        palettes: List[List[int]] - палитры групп по FRAMES_PER_TASK
+        кадров
+        output_path: str - путь до файла анимации (.gif или .mp4)
+        fps: int - число кадров в секунду
+    Return:
+        str - путь до файла анимации
+    """
+    from PIL import Image
+
+    indices = np.load(frame_path, mmap_mode="r")
+    width, height = frame_size()
+
+    def images():
+        for i, frame in enumerate(indices):
+            image = Image.frombytes("P", (width, height), frame.tobytes())
+            image.putpalette(palettes[i // FRAMES_PER_TASK])
+            yield image
+
+    if animation_format(output_path) == "gif":
+        frames = images()
+        # Поиск совпадающих участков кадров (optimize) в Pillow на порядок
+        # дольше самой записи
+        next(frames).save(
+            output_path,
+            save_all=True,
+            append_images=frames,
+            duration=int(1000 / fps),
+            loop=0,
+            optimize=False,
+        )
+    else:
+        process = subprocess.Popen(
+            [
+                shutil.which("ffmpeg"), "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24",
+                "-s", f"{width}x{height}", "-framerate", str(fps),
+                "-i", "-",
+                "-pix_fmt", "yuv420p",
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                output_path,
+            ],
+            stdin=subprocess.PIPE,
+        )
+        try:
+            for image in images():
+                process.stdin.write(image.convert("RGB").tobytes())
+        finally:
+            process.stdin.close()
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed to write {output_path}")
+    return output_path
+
+
+def _warm_up() -> int:
+    """Пустое задание, запускающее процессы пула и импортирующее Pillow"""
+    from PIL import Image  # noqa: F401
+
+    return os.getpid()
+
+
+class RenderStage:
+    """Пул процессов для построения графиков и анимаций"""
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        """Инициализация
+
+        Args:
+            workers: Optional[int] - число процессов отрисовки
+        """
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        # Процессы пула запускаются первым заданием: оно отправляется
+        # отсюда, а не из потока сборки анимаций, чтобы процессы
+        # создавались из основного потока
+        self.pool.submit(_warm_up)
+        # Поток, собирающий анимации из кадров, отрисованных в пуле
+        self.coordinator = ThreadPoolExecutor(max_workers=1)
+        self.futures: List[Future] = []
+
+    def plot(
+        self,
+        path: str,
+        x: np.ndarray,
+        curves: Sequence[Dict[str, object]],
+        xlabel: str = "x",
+        ylabel: str = "u",
+    ) -> Future:
+        """Построение графика в пуле (аргументы как у render_plot)
+
+        Return:
+            Future - путь до файла изображения по завершении
+        """
+        future = self.pool.submit(render_plot, path, x, curves, xlabel, ylabel)
+        self.futures.append(future)
+        return future
+
+    def animate(
+        self, snapshot_path: str, output_path: str, fps: int = 10
+    ) -> Future:
+        """Анимация сохранённых снимков решения
+
+        Кадры отрисовываются в пуле группами по FRAMES_PER_TASK, сборка
+        выполняется в отдельном потоке, поэтому вызов не блокируется
+
+        Args:
+            snapshot_path: str - файл снимков (GlobalSolver.save_snapshots)
+            output_path: str - путь до файла анимации (.gif или .mp4)
+            fps: int - число кадров в секунду
+        Return:
+            Future - путь до файла анимации по завершении
+        """
+        animation_format(output_path)
+        with np.load(snapshot_path) as data:
+            x, frames, times = data["x"], data["v"], data["t"]
+        future = self.coordinator.submit(
+            self._animate, x, frames, times, output_path, fps
+        )
+        self.futures.append(future)
+        return future
+
+    def _animate(
+        self,
+        x: np.ndarray,
+        frames: np.ndarray,
+        times: np.ndarray,
+        output_path: str,
+        fps: int,
+    ) -> str:
+        ylim = (float(frames.min()), float(frames.max()))
+        margin = 0.05 * (ylim[1] - ylim[0]) or 0.5
+        ylim = (ylim[0] - margin, ylim[1] + margin)
+        width, height = frame_size()
+        with tempfile.TemporaryDirectory() as frame_dir:
+            frame_path = os.path.join(frame_dir, "frames.npy")
+            np.lib.format.open_memmap(
+                frame_path, "w+", np.uint8, (len(frames), height, width)
+            ).flush()
+            tasks = [
+                self.pool.submit(
+                    render_frames,
+                    x,
+                    frames[i:i + FRAMES_PER_TASK],
+                    times[i:i + FRAMES_PER_TASK],
+                    i,
+                    ylim,
+                    frame_path,
+                )
+                for i in range(0, len(frames), FRAMES_PER_TASK)
+            ]
+            palettes = [task.result() for task in tasks]
+            return assemble_animation(frame_path, palettes, output_path, fps)
+
+    def wait(self) -> None:
+        """Ожидание всех отправленных заданий (ошибки пробрасываются)
+
+        Args:
+            None
+        Return:
+            None
+        """
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+        return None
+
+    def close(self) -> None:
+        """Ожидание заданий и остановка пула
+
+        Args:
+            None
+        Return:
+            None
+        """
+        try:
+            self.wait()
+        finally:
+            self.coordinator.shutdown(wait=True)
+            self.pool.shutdown(wait=True)
+        return None
+
+
+def start_stage(workers: Optional[int] = None) -> RenderStage:
+    """Запуск стадии отрисовки для текущего процесса
+
+    Args:
+        workers: Optional[int] - число процессов отрисовки
+    Return:
+        RenderStage - запущенная стадия
+    """
+    global _STAGE
+    if _STAGE is None:
+        _STAGE = RenderStage(workers)
+    return _STAGE
+
+
+def stop_stage() -> None:
+    """Ожидание отрисовки и остановка стадии, если она запущена
+
+    Args:
+        None
+    Return:
+        None
+    """
+    global _STAGE
+    if _STAGE is not None:
+        stage, _STAGE = _STAGE, None
+        stage.close()
+    return None
+
+
+def plot(
+    path: str,
+    x: np.ndarray,
+    curves: Sequence[Dict[str, object]],
+    xlabel: str = "x",
+    ylabel: str = "u",
+) -> Optional[Future]:
+    """Построение графика в стадии отрисовки, если она запущена, иначе
+    сразу в текущем процессе (аргументы как у render_plot)
+
+    Return:
+        Optional[Future] - Future при отрисовке в стадии, иначе None
+    """
+    if _STAGE is not None:
+        return _STAGE.plot(path, x, curves, xlabel, ylabel)
+    render_plot(path, x, curves, xlabel, ylabel)
+    return None
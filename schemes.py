@@ -0,0 +1,370 @@
+"""Реестр разностных схем
+
+Схема описывается коэффициентами шаблона, типом граничных условий и
+начальным условием, а считается единым векторизованным солвером
+StencilSolver. Реестр не импортирует модули отдельных солверов и
+matplotlib, поэтому список схем доступен сразу, а экземпляры солверов
+можно создавать многократно без накладных расходов на импорт.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+import math
+import numpy as np
+from burgers.exact import sine_solution
+from main import GlobalSolver
+from multigrid.mg import solve
+
+
+@dataclass(frozen=True)
+class Scheme:
+    """Описание разностной схемы
+
+    Attributes:
+        name: str - имя схемы в реестре
+        description: str - краткое описание
+        equation: str - "burgers" (параметры L, NX, NT, CFL, C) или
+        "diffusion" (параметры H, NY, Time, VNM, nu, U0, U1, A)
+        kernel: str - алгоритм шага: "flux" (противопоточная схема для
+        потока v^2 / 2), "explicit", "three-level" или "implicit"
+        stencil: Tuple[Tuple[int, float], ...] - пары (смещение,
+        коэффициент) основного шаблона (для "flux" - при v > 0)
+        upwind_stencil: Tuple[Tuple[int, float], ...] - шаблон "flux"
+        при v <= 0
+        start_stencil: Tuple[Tuple[int, float], ...] - шаблон явного
+        первого шага трёхслойной схемы
+        divisor: float - знаменатель множителя C * dt / h в схеме "flux"
+        ghost: int - число мнимых ячеек с каждой стороны
+        boundary: str - "periodic" или "dirichlet"
+        periodic_map: Tuple[Tuple[int, int], ...] - пары (куда, откуда)
+        копирования значений для периодических условий
+        initial: str - начальное условие: "sine", "step" или "zero"
+        legacy: str - модуль, реализацию которого повторяет схема
+    """
+
+    name: str
+    description: str
+    equation: str
+    kernel: str
+    stencil: Tuple[Tuple[int, float], ...]
+    upwind_stencil: Tuple[Tuple[int, float], ...] = ()
+    start_stencil: Tuple[Tuple[int, float], ...] = ()
+    divisor: float = 1.0
+    ghost: int = 0
+    boundary: str = "dirichlet"
+    periodic_map: Tuple[Tuple[int, int], ...] = ()
+    initial: str = "zero"
+    legacy: str = ""
+
+
+SCHEMES: Dict[str, Scheme] = {}
+
+
+def register_scheme(scheme: Scheme) -> Scheme:
+    """Добавление схемы в реестр
+
+    Args:
+        scheme: Scheme - описание схемы
+    Return:
+        Scheme - та же схема
+    """
+    if scheme.name in SCHEMES:
+        raise ValueError(f"Scheme '{scheme.name}' is already registered")
+    SCHEMES[scheme.name] = scheme
+    return scheme
+
+
+def list_schemes() -> List[Scheme]:
+    """Список зарегистрированных схем, упорядоченный по имени"""
+    return [SCHEMES[name] for name in sorted(SCHEMES)]
+
+
+def _apply(
+    v: np.ndarray, stencil: Tuple[Tuple[int, float], ...], lo: int, hi: int
+) -> np.ndarray:
+    """Сумма коэффициент * v[i + смещение] для узлов i из [lo, hi)"""
+    total = np.zeros(hi - lo, dtype=v.dtype)
+    for offset, coef in stencil:
+        total += coef * v[lo + offset:hi + offset]
+    return total
+
+
+def step_function(x: np.ndarray) -> np.ndarray:
+    """Ступенчатое начальное условие задач конвекции (init_func)"""
+    return np.select(
+        [(x < 0.2) | ((0.4 <= x) & (x < 0.6)) | (0.8 <= x), 0.6 <= x],
+        [0.6, 0.4],
+        0.2,
+    )
+
+
+class StencilSolver(GlobalSolver):
+    """Солвер, выполняющий расчёт по описанию схемы из реестра"""
+
+    scheme: Scheme
+
+    def _init_scheme_values(self) -> None:
+        """Инициализация параметров схемы и сетки
+
+        Args:
+            None
+        Return:
+            None
+        """
+        if self.scheme.equation == "burgers":
+            self.h = self.L / (self.NX - 1)
+            self.dt = self.CFL * self.h / self.C
+            n = int(self.NX)
+        else:
+            self.h = self.H / (self.NY - 1)
+            self.dt = self.VNM * (self.h ** 2.) / self.nu
+            self.NT = self.Time / self.dt
+            n = int(self.NY)
+        g = self.scheme.ghost
+        # Узлы те же, что и у np.arange(-g * h, (n + g) * h, h) в модулях
+        # солверов, но число узлов не зависит от ошибок округления
+        self.x = np.arange(
+            -g * self.h, (n + g - 0.5) * self.h, self.h, dtype=self.dtype
+        )
+        return None
+
+    def _init_value(self) -> None:
+        self.v = np.zeros(len(self.x), dtype=self.dtype)
+        self.vn = np.zeros(len(self.x), dtype=self.dtype)
+        self.vl = np.zeros(len(self.x), dtype=self.dtype)
+
+    def init_value(self) -> None:
+        """Инициализация начальных значений
+
+        Args:
+            None
+        Return:
+            None
+        """
+        self._init_value()
+        if self.scheme.initial == "sine":
+            # Н.У. имеет вид: C0 + C1 * sin(m * pi * x / L)
+            self.v[:] = self.C0 + self.C1 * np.sin(
+                self.x * self.m * math.pi / self.L
+            )
+        elif self.scheme.initial == "step":
+            self.v[:] = step_function(self.x)
+        return None
+
+    def init_boundary(self) -> None:
+        """Инициализация граничных условий
+
+        Args:
+            None
+        Return:
+            None
+        """
+        if self.scheme.boundary == "periodic":
+            for dst, src in self.scheme.periodic_map:
+                self.vn[dst] = self.vn[src]
+        else:
+            self.vn[0] = self.U0
+            self.vn[-1] = self.U1
+        return None
+
+    def run_scheme(self) -> None:
+        """Алгоритм вычисления решения на схеме
+
+        Args:
+            None
+        Return:
+            None
+        """
+        getattr(self, f"_run_{self.scheme.kernel.replace('-', '_')}")()
+        return None
+
+    def _run_flux(self) -> None:
+        s = self.scheme
+        lo, hi = s.ghost, len(self.x) - s.ghost
+        coef = self.C * self.dt / self.h / s.divisor
+        for j in range(1, int(self.NT)):
+            flux = self.v ** 2. / 2.
+            positive = _apply(flux, s.stencil, lo, hi)
+            negative = _apply(flux, s.upwind_stencil, lo, hi)
+            self.vn[lo:hi] = self.v[lo:hi] - coef * np.where(
+                self.v[lo:hi] > 0, positive, negative
+            )
+            self.init_boundary()
+            self.v, self.vn = self.vn, self.v
+            self.record_snapshot(j)
+
+    def _run_explicit(self) -> None:
+        hi = len(self.x) - 1
+        self.init_boundary()
+        self.v = self.vn.copy()
+        for j in range(1, int(self.NT) - 1):
+            self.vn[1:hi] = (
+                self.v[1:hi]
+                + self.VNM * _apply(self.v, self.scheme.stencil, 1, hi)
+                + self.A * self.dt
+            )
+            self.init_boundary()
+            self.v, self.vn = self.vn, self.v
+            self.record_snapshot(j)
+
+    def _run_three_level(self) -> None:
+        hi = len(self.x) - 1
+        self.vn[1:hi] = (
+            self.v[1:hi]
+            + self.VNM * _apply(self.v, self.scheme.start_stencil, 1, hi)
+            + self.A * self.dt
+        )
+        self.init_boundary()
+        self.vl = self.v.copy()
+        self.v = self.vn.copy()
+        for j in range(1, int(self.NT) - 1):
+            self.vn[1:hi] = (
+                self.VNM * _apply(self.v, self.scheme.stencil, 1, hi)
+                + (1 - 2 * self.VNM) * self.vl[1:hi]
+                + self.A * self.dt
+            ) / (1 + 2 * self.VNM)
+            self.init_boundary()
+            self.vl, self.v, self.vn = self.v, self.vn, self.vl
+            self.record_snapshot(j)
+
+    def _run_implicit(self) -> None:
+        # (1 + 2 VNM) v_i - VNM (v_{i+1} + v_{i-1}) = v_i^n + A dt
+        # приводится к виду sigma * v - laplace(v) = f
+        sigma = 1.0 / (self.nu * self.dt)
+        self.init_boundary()
+        self.v = self.vn.copy()
+        for j in range(1, int(self.NT) - 1):
+            f = sigma * self.v + self.A / self.nu
+            self.init_boundary()
+            self.vn, _ = solve(f, self.h, sigma, u0=self.vn)
+            self.v = self.vn.copy()
+            self.record_snapshot(j)
+
+    def exact_solution(self) -> Optional[np.ndarray]:
+        """Точное решение после NT - 1 шагов для начального условия
+        "sine" (до образования разрыва), для остальных схем - None"""
+        if self.scheme.initial != "sine":
+            return None
+        # Шаблон аппроксимирует h * d/dx, умноженное на первый момент
+        # sum(смещение * коэффициент) / divisor
+        moment = sum(offset * coef for offset, coef in self.scheme.stencil)
+        return sine_solution(
+            self.x,
+            (int(self.NT) - 1) * self.dt,
+            self.C0,
+            self.C1,
+            self.m * math.pi / self.L,
+            self.C * moment / self.scheme.divisor,
+        )
+
+    def save_to_file(self) -> None:
+        """Запись решения в расчётной области (без мнимых ячеек) в файл
+
+        Args:
+            None
+        Return:
+            None
+        """
+        g = self.scheme.ghost
+        with open(self.output_filepath, "w") as f:
+            f.write('Variables = "x", "u",\n')
+            for i in range(g, len(self.x) - g):
+                f.write(f"{self.x[i]}, {self.v[i]}\n")
+        return None
+
+
+@lru_cache(maxsize=None)
+def solver_class(name: str) -> Type[StencilSolver]:
+    """Класс солвера для схемы из реестра (создаётся один раз)
+
+    Args:
+        name: str - имя схемы
+    Return:
+        Type[StencilSolver] - класс, совместимый с main.main
+    """
+    if name not in SCHEMES:
+        raise KeyError(f"Unknown scheme '{name}'")
+    class_name = "".join(p.capitalize() for p in name.split("-")) + "Solver"
+    return type(class_name, (StencilSolver,), {"scheme": SCHEMES[name]})
+
+
+_UPWIND = dict(
+    equation="burgers",
+    kernel="flux",
+    stencil=((0, 1.0), (-1, -1.0)),
+    upwind_stencil=((1, 1.0), (0, -1.0)),
+    divisor=2.0,
+    ghost=1,
+    boundary="periodic",
+    periodic_map=((0, -3), (1, -2), (-1, 2)),
+)
+_LEONARD = dict(
+    equation="burgers",
+    kernel="flux",
+    stencil=((1, 2.0), (0, 3.0), (-1, -6.0), (-2, 1.0)),
+    upwind_stencil=((2, -1.0), (0, -3.0), (1, 6.0), (-1, -2.0)),
+    divisor=6.0,
+    ghost=2,
+    boundary="periodic",
+    periodic_map=((0, -4), (1, -3), (-2, 2), (-1, 3)),
+)
+_DIFFUSION = dict(
+    equation="diffusion",
+    stencil=((-1, 1.0), (0, -2.0), (1, 1.0)),
+    boundary="dirichlet",
+    initial="zero",
+)
+
+register_scheme(Scheme(
+    name="upwind",
+    description="Противопоточная схема первого порядка, синусоида",
+    initial="sine",
+    legacy="burgers.s1_t1",
+    **_UPWIND,
+))
+register_scheme(Scheme(
+    name="upwind-step",
+    description="Противопоточная схема первого порядка, ступенька",
+    initial="step",
+    legacy="burgers.s1_t2",
+    **_UPWIND,
+))
+register_scheme(Scheme(
+    name="leonard",
+    description="Схема Леонарда, синусоида",
+    initial="sine",
+    legacy="burgers.s2_t1",
+    **_LEONARD,
+))
+register_scheme(Scheme(
+    name="leonard-step",
+    description="Схема Леонарда, ступенька",
+    initial="step",
+    legacy="burgers.s2_t2",
+    **_LEONARD,
+))
+register_scheme(Scheme(
+    name="ftcs",
+    description="Явная схема FTCS для течения в канале",
+    kernel="explicit",
+    legacy="base.s1",
+    **_DIFFUSION,
+))
+register_scheme(Scheme(
+    name="three-level",
+    description="Трёхслойная схема для течения в канале",
+    kernel="three-level",
+    legacy="base.s2",
+    **{
+        **_DIFFUSION,
+        "stencil": ((-1, 2.0), (1, 2.0)),
+        "start_stencil": _DIFFUSION["stencil"],
+    },
+))
+register_scheme(Scheme(
+    name="implicit",
+    description="Неявная схема для течения в канале (многосеточный метод)",
+    kernel="implicit",
+    legacy="base.s3",
+    **_DIFFUSION,
+))
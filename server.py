@@ -0,0 +1,626 @@
+"""Локальный сервер очереди расчётов
+
+Сервер на asyncio принимает задания через Unix-сокет или localhost в виде
+строк JSON и выполняет их в пуле заранее запущенных процессов, в которых
+уже импортированы NumPy, main, реестр схем и указанные модули солверов.
+Задания с большим приоритетом выполняются раньше. По каждому заданию
+клиенту отправляются события "queued", "started", "progress" (номер шага
+step из steps не чаще раза в PROGRESS_INTERVAL секунд) и "done" (или
+"error"). Если процесс пула аварийно завершился (например, по нехватке
+памяти), выполнявшиеся задания завершаются ошибкой, а пул создаётся
+заново.
+
+Формат задания:
+    {"solver": "leonard", "input": "data/input/conv/task_1.txt",
+     "output": "out.txt", "params": {"NX": 201}, "precision": "float64",
+     "priority": 0, "fields": false}
+
+Клиенты не аутентифицируются, поэтому задания ограничены: солвер - схема
+из реестра или модуль из списка предварительно импортируемых, входной
+файл - внутри корня входных данных сервера, output - имя файла в рабочей
+директории сервера (если не задано, содержимое результата возвращается
+в событии "done", а файл удаляется), кэш задаётся только сервером.
+По умолчанию сервер слушает Unix-сокет, доступный только его владельцу.
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+from queue import Empty
+from typing import Callable, Dict, List, Optional
+import asyncio
+import importlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+from main import PRECISIONS
+import schemes
+
+
+# Ограничение длины одной строки протокола, байт
+LINE_LIMIT = 16 * 1024**2
+# Unix-сокет по умолчанию
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "cfd_solver.sock")
+# Минимальный интервал между событиями "progress" одного задания, с
+PROGRESS_INTERVAL = 0.5
+# Период проверки очереди событий хода расчёта, с
+PROGRESS_POLL = 0.2
+
+# Очередь событий хода расчёта процесса пула
+_PROGRESS = None
+
+
+def _warm_up(preload: List[str], workdir: str, progress) -> None:
+    """Инициализация процесса пула: импорт всего, что нужно для расчёта
+
+    Args:
+        preload: List[str] - дополнительные модули солверов
+        workdir: str - рабочая директория сервера (в неё же солверы
+        записывают графики)
+        progress: multiprocessing.Queue - очередь событий хода расчёта
+    Return:
+        None
+    """
+    import matplotlib
+
+    global _PROGRESS
+    _PROGRESS = progress
+    os.chdir(workdir)
+    matplotlib.use("Agg")
+    for module in ["numpy", "main", "schemes", *preload]:
+        importlib.import_module(module)
+    return None
+
+
+def _ping() -> int:
+    """Пустое задание, запускающее процесс пула заранее"""
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def _next_progress(progress) -> Optional[tuple]:
+    """Ожидание события хода расчёта (в потоке, не блокируя цикл событий)
+
+    Args:
+        progress: multiprocessing.Queue - очередь событий
+    Return:
+        Optional[tuple] - (номер задания, шаг, NT) или None, если за
+        PROGRESS_POLL секунд событий не было
+    """
+    try:
+        return progress.get(timeout=PROGRESS_POLL)
+    except Empty:
+        return None
+
+
+def run_job(
+    job: Dict[str, object], job_id: int, path: str
+) -> Dict[str, object]:
+    """Выполнение одного задания в процессе пула
+
+    Args:
+        job: Dict[str, object] - задание (см. описание модуля)
+        job_id: int - номер задания для событий хода расчёта
+        path: str - файл результата (output или временный файл, который
+        удаляет сервер)
+    Return:
+        Dict[str, object] - диагностика, путь до файла результата (или
+        его содержимое "text", если output не задан), время расчёта и,
+        если запрошено, итоговые поля
+    """
+    from main import main
+
+    last = -PROGRESS_INTERVAL
+
+    def progress(step: int, steps: int) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        if now - last >= PROGRESS_INTERVAL:
+            last = now
+            _PROGRESS.put((job_id, step, steps))
+
+    output = job.get("output")
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        result = main(
+            job["input"],
+            path,
+            job["solver"],
+            job.get("precision", "float64"),
+            job.get("cache_dir"),
+            overrides=job.get("params"),
+            progress=progress,
+        )
+    reply = {
+        "worker": os.getpid(),
+        "elapsed": time.perf_counter() - start,
+        "output": output,
+        "diagnostics": result["diagnostics"],
+    }
+    if output is None:
+        reply["text"] = result["output"]
+    if job.get("fields"):
+        reply["fields"] = {
+            name: value.tolist() for name, value in result["fields"].items()
+        }
+    return reply
+
+
+class JobServer:
+    """Очередь заданий с приоритетами поверх пула процессов"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        preload: Optional[List[str]] = None,
+        cache_dir: Optional[str] = None,
+        workdir: Optional[str] = None,
+        input_root: Optional[str] = None,
+    ) -> None:
+        """Инициализация
+
+        Args:
+            workers: int - число процессов пула
+            preload: Optional[List[str]] - модули солверов, импортируемые
+            в процессах пула заранее (кроме схем реестра разрешены только
+            они)
+            cache_dir: Optional[str] - директория кэша результатов для
+            всех заданий
+            workdir: Optional[str] - директория для файлов результатов
+            (по умолчанию создаётся временная)
+            input_root: Optional[str] - директория, вне которой входные
+            файлы не принимаются (по умолчанию текущая)
+        """
+        self.workers = workers
+        self.preload = preload or []
+        self.cache_dir = cache_dir and os.path.abspath(cache_dir)
+        self.workdir = os.path.realpath(
+            workdir or tempfile.mkdtemp(prefix="cfd_server_")
+        )
+        os.makedirs(self.workdir, exist_ok=True)
+        self.input_root = os.path.realpath(input_root or os.getcwd())
+        self.pool = None
+        self.progress = None
+        self._relay = None
+        self.queue = None
+        # Функции отправки событий выполняющихся заданий
+        self._running = {}
+        self._ids = itertools.count(1)
+        self._order = itertools.count()
+
+    async def start(self) -> None:
+        """Запуск пула процессов и обработчиков очереди
+
+        Args:
+            None
+        Return:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        self._start_pool()
+        # Все процессы запускаются и прогреваются до приёма заданий
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(self.pool, _ping)
+                for _ in range(self.workers)
+            ]
+        )
+        self.queue = asyncio.PriorityQueue()
+        self._dispatchers = [
+            asyncio.create_task(self._dispatch())
+            for _ in range(self.workers)
+        ]
+        return None
+
+    def _start_pool(self) -> None:
+        """Создание пула процессов и очереди событий хода расчёта
+
+        Args:
+            None
+        Return:
+            None
+        """
+        # Очередь создаётся заново вместе с пулом: аварийно завершившийся
+        # процесс мог оставить её блокировку захваченной
+        self.progress = multiprocessing.Queue()
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_warm_up,
+            initargs=(self.preload, self.workdir, self.progress),
+        )
+        self._relay = asyncio.create_task(self._relay_progress(self.progress))
+        return None
+
+    async def _relay_progress(self, progress) -> None:
+        """Пересылка событий хода расчёта клиентам выполняющихся заданий"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, _next_progress, progress)
+            if item is None:
+                continue
+            job_id, step, steps = item
+            notify = self._running.get(job_id)
+            if notify is not None:
+                notify(
+                    {
+                        "event": "progress",
+                        "job": job_id,
+                        "step": step,
+                        "steps": steps,
+                    }
+                )
+
+    def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Замена пула, в котором аварийно завершился процесс
+
+        Args:
+            broken: ProcessPoolExecutor - пул, в котором выполнялось
+            задание (если пул уже заменён, ничего не делается)
+        Return:
+            None
+        """
+        if self.pool is not broken:
+            return None
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._relay.cancel()
+        self._start_pool()
+        print("\tWorker process died: process pool restarted")
+        return None
+
+    async def stop(self) -> None:
+        """Остановка обработчиков очереди и пула процессов
+
+        Args:
+            None
+        Return:
+            None
+        """
+        for task in self._dispatchers:
+            task.cancel()
+        self._relay.cancel()
+        await asyncio.gather(
+            *self._dispatchers, self._relay, return_exceptions=True
+        )
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        return None
+
+    def validate(self, job: Dict[str, object]) -> Dict[str, object]:
+        """Проверка задания и приведение путей к путям сервера
+
+        Args:
+            job: Dict[str, object] - задание от клиента
+        Return:
+            Dict[str, object] - задание с абсолютными путями input,
+            output и cache_dir
+        """
+        if not isinstance(job, dict):
+            raise ValueError("Job must be a JSON object")
+        if "solver" not in job or "input" not in job:
+            raise ValueError("'solver' and 'input' are required")
+        for key in ("solver", "input", "output", "precision"):
+            if key in job and not isinstance(job[key], str) and (
+                key != "output" or job[key] is not None
+            ):
+                raise ValueError(f"'{key}' must be a string")
+        if job.get("precision", "float64") not in PRECISIONS:
+            raise ValueError(f"'precision' must be one of {list(PRECISIONS)}")
+        params = job.get("params")
+        if params is not None and not (
+            isinstance(params, dict) and all(
+                isinstance(v, (int, float)) and not isinstance(v, bool)
+                for v in params.values()
+            )
+        ):
+            raise ValueError("'params' must be an object of numbers")
+        priority = job.get("priority", 0)
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise ValueError("'priority' must be an integer")
+        if job["solver"] not in schemes.SCHEMES and (
+            job["solver"] not in self.preload
+        ):
+            raise ValueError(
+                f"Solver '{job['solver']}' is neither a registered scheme "
+                "nor preloaded by the server"
+            )
+        if "cache_dir" in job:
+            raise ValueError("'cache_dir' is set by the server")
+        job = dict(job)
+        path = os.path.realpath(os.path.join(self.input_root, job["input"]))
+        if os.path.commonpath([path, self.input_root]) != self.input_root:
+            raise ValueError(f"Input must be inside {self.input_root}")
+        job["input"] = path
+        output = job.get("output")
+        if output is not None:
+            if output != os.path.basename(output) or output in (".", ".."):
+                raise ValueError("'output' must be a plain file name")
+            job["output"] = os.path.join(self.workdir, output)
+        job["cache_dir"] = self.cache_dir
+        return job
+
+    def submit(
+        self, job: Dict[str, object], notify: Callable[[Dict], None]
+    ) -> int:
+        """Постановка задания в очередь
+
+        Args:
+            job: Dict[str, object] - задание (проверяется validate)
+            notify: Callable[[Dict], None] - функция отправки событий
+        Return:
+            int - номер задания
+        """
+        job = self.validate(job)
+        job_id = next(self._ids)
+        priority = -int(job.get("priority", 0))
+        self.queue.put_nowait(
+            (priority, next(self._order), job_id, job, notify)
+        )
+        notify(
+            {"event": "queued", "job": job_id, "position": self.queue.qsize()}
+        )
+        return job_id
+
+    async def _dispatch(self) -> None:
+        """Обработчик очереди: одно задание на процесс пула за раз"""
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job_id, job, notify = await self.queue.get()
+            notify({"event": "started", "job": job_id})
+            pool = self.pool
+            self._running[job_id] = notify
+            scratch = None
+            if job.get("output") is None:
+                # Временный файл удаляется сервером, в том числе если
+                # процесс пула погиб, не завершив задание
+                fd, scratch = tempfile.mkstemp(
+                    prefix="cfd_job_", suffix=".txt", dir=self.workdir
+                )
+                os.close(fd)
+            try:
+                reply = await loop.run_in_executor(
+                    pool, run_job, job, job_id, job.get("output") or scratch
+                )
+            except BrokenProcessPool as e:
+                notify({"event": "error", "job": job_id, "error": repr(e)})
+                self._restart_pool(pool)
+            except Exception as e:
+                notify({"event": "error", "job": job_id, "error": repr(e)})
+            else:
+                notify({"event": "done", "job": job_id, **reply})
+            finally:
+                if scratch is not None:
+                    snapshots = f"{os.path.splitext(scratch)[0]}_snapshots.npz"
+                    for name in (scratch, snapshots):
+                        if os.path.exists(name):
+                            os.remove(name)
+                del self._running[job_id]
+                self.queue.task_done()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Обработка соединения: каждая строка - задание в формате JSON
+
+        Args:
+            reader: asyncio.StreamReader - поток чтения
+            writer: asyncio.StreamWriter - поток записи
+        Return:
+            None
+        """
+        pending = set()
+        idle = asyncio.Event()
+        idle.set()
+
+        def notify(event: Dict[str, object]) -> None:
+            if event["event"] in ("done", "error"):
+                pending.discard(event["job"])
+                if not pending:
+                    idle.set()
+            if not writer.is_closing():
+                writer.write(json.dumps(event).encode("utf-8") + b"\n")
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    job_id = self.submit(json.loads(line), notify)
+                except ValueError as e:
+                    notify({"event": "error", "job": None, "error": str(e)})
+                    continue
+                except Exception as e:
+                    # Ошибка в одном задании не должна закрывать соединение
+                    # с уже принятыми заданиями
+                    notify({"event": "error", "job": None, "error": repr(e)})
+                    continue
+                idle.clear()
+                pending.add(job_id)
+                await writer.drain()
+            # Клиент закончил отправку заданий: соединение закрывается
+            # после доставки событий всех принятых заданий
+            await idle.wait()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+        return None
+
+
+async def serve(
+    socket_path: Optional[str],
+    host: str,
+    port: int,
+    workers: int,
+    preload: List[str],
+    cache_dir: Optional[str],
+    workdir: Optional[str] = None,
+    input_root: Optional[str] = None,
+) -> None:
+    """Запуск сервера до получения SIGINT или SIGTERM
+
+    Args:
+        socket_path: Optional[str] - путь до Unix-сокета (если не задан,
+        используется TCP на host:port без аутентификации)
+        host: str - адрес для TCP
+        port: int - порт для TCP
+        workers: int - число процессов пула
+        preload: List[str] - модули солверов для предварительного импорта
+        cache_dir: Optional[str] - директория кэша результатов
+        workdir: Optional[str] - директория для файлов результатов
+        input_root: Optional[str] - корень допустимых входных файлов
+    Return:
+        None
+    """
+    jobs = JobServer(workers, preload, cache_dir, workdir, input_root)
+    await jobs.start()
+    if socket_path is not None:
+        # Сокет создаётся сразу с доступом только для владельца
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                jobs.handle, socket_path, limit=LINE_LIMIT
+            )
+        finally:
+            os.umask(umask)
+    else:
+        server = await asyncio.start_server(
+            jobs.handle, host, port, limit=LINE_LIMIT
+        )
+    # Обработчики сигналов устанавливаются после запуска процессов пула,
+    # чтобы те их не унаследовали
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    print(f"\tServing on {socket_path or f'{host}:{port}'}")
+    print(f"\tResults in {jobs.workdir}")
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        await jobs.stop()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
+    return None
+
+
+async def submit_jobs(
+    jobs: List[Dict[str, object]],
+    socket_path: Optional[str] = DEFAULT_SOCKET,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    on_event: Optional[Callable[[Dict], None]] = None,
+) -> List[Dict[str, object]]:
+    """Клиент: отправка заданий и получение событий до их завершения
+
+    Args:
+        jobs: List[Dict[str, object]] - задания
+        socket_path: Optional[str] - путь до Unix-сокета сервера (None -
+        подключение по TCP)
+        host: str - адрес сервера для TCP
+        port: int - порт сервера для TCP
+        on_event: Optional[Callable[[Dict], None]] - функция, вызываемая
+        для каждого события по мере поступления
+    Return:
+        List[Dict[str, object]] - итоговые события ("done" или "error")
+        в порядке завершения заданий
+    """
+    if socket_path is not None:
+        reader, writer = await asyncio.open_unix_connection(
+            socket_path, limit=LINE_LIMIT
+        )
+    else:
+        reader, writer = await asyncio.open_connection(
+            host, port, limit=LINE_LIMIT
+        )
+    for job in jobs:
+        writer.write(json.dumps(job).encode("utf-8") + b"\n")
+    await writer.drain()
+    finished = []
+    try:
+        while len(finished) < len(jobs):
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection")
+            event = json.loads(line)
+            if on_event is not None:
+                on_event(event)
+            if event["event"] in ("done", "error"):
+                finished.append(event)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return finished
+
+
+def _parse_params(items: List[str]) -> Dict[str, float]:
+    """Разбор параметров вида KEY=VALUE из командной строки"""
+    params = {}
+    for item in items:
+        key, val = item.split("=", 1)
+        params[key.strip()] = float(val)
+    return params
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(prog="Solver job server")
+    parser.add_argument("--socket", type=str, default=DEFAULT_SOCKET)
+    parser.add_argument("--tcp", action="store_true")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve")
+    serve_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    serve_parser.add_argument("--preload", type=str, nargs="*", default=[])
+    serve_parser.add_argument("--cache-dir", type=str, default=None)
+    serve_parser.add_argument("--workdir", type=str, default=None)
+    serve_parser.add_argument("--input-root", type=str, default=None)
+
+    submit_parser = commands.add_parser("submit")
+    submit_parser.add_argument("input_filepath", type=str)
+    submit_parser.add_argument("solver_file", type=str)
+    submit_parser.add_argument("--output", type=str, default=None)
+    submit_parser.add_argument("--param", type=str, nargs="*", default=[])
+    submit_parser.add_argument("--precision", type=str, default="float64")
+    submit_parser.add_argument("--priority", type=int, default=0)
+    args = parser.parse_args()
+    socket_path = None if args.tcp else args.socket
+
+    if args.command == "serve":
+        asyncio.run(
+            serve(
+                socket_path,
+                args.host,
+                args.port,
+                args.workers,
+                args.preload,
+                args.cache_dir,
+                args.workdir,
+                args.input_root,
+            )
+        )
+    else:
+        job = {
+            "solver": args.solver_file,
+            "input": os.path.abspath(args.input_filepath),
+            "output": args.output,
+            "params": _parse_params(args.param),
+            "precision": args.precision,
+            "priority": args.priority,
+        }
+        asyncio.run(
+            submit_jobs(
+                [job],
+                socket_path,
+                args.host,
+                args.port,
+                on_event=lambda event: print(f"\t{json.dumps(event)}"),
+            )
+        )